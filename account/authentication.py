@@ -0,0 +1,17 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from house_rent.routers import use_primary
+
+
+class PrimaryJWTAuthentication(JWTAuthentication):
+    """Look token users up on the primary; a replica may not have them yet."""
+
+    def get_user(self, validated_token):
+        with use_primary():
+            return super().get_user(validated_token)
+
+
+class PrimaryJWTScheme(SimpleJWTScheme):
+    # Document the subclass like the stock simplejwt authentication
+    target_class = PrimaryJWTAuthentication
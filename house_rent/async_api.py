@@ -0,0 +1,135 @@
+"""
+Async request path for the hot read endpoints.
+
+``AsyncReadMixin.as_async_view(action)`` serves a viewset action from an
+async view. Authentication, permissions and throttles run as in DRF's
+``dispatch``, in a worker thread since they may query. The ``a<action>``
+handler then reads with the async ORM, so under an ASGI server
+(``uvicorn house_rent.asgi:application``) the event loop keeps serving other
+requests while the database answers. Querysets, serializers, pagination and
+response cache keys are the viewset's own, so both paths return the same
+responses. Requests an async handler does not cover (see ``handles_async``)
+are passed to the sync action in a thread.
+
+Streamed responses built by the sync actions wrap their iterators in
+``aiter_in_thread`` when served by ASGI, which Django would otherwise buffer
+into a list before sending.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import MethodNotAllowed, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+async def aiter_in_thread(iterator):
+    """
+    Yield the items of a sync ``iterator``, producing each in the request's
+    worker thread, so a queryset ``iterator()`` keeps its connection.
+    """
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while (item := await sync_to_async(next)(iterator, done)) is not done:
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+class AsyncReadMixin:
+    @classmethod
+    def as_async_view(cls, action, **initkwargs):
+        """Return an async view serving GET and HEAD with ``action``."""
+
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.action_map = {"get": action, "head": action}
+            self.args = args
+            self.kwargs = kwargs
+            self.headers = self.default_response_headers
+            request = self.initialize_request(request, *args, **kwargs)
+            self.request = request
+            try:
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+                if self.action != action:
+                    raise MethodNotAllowed(request.method)
+                if self.handles_async(request):
+                    handler = getattr(self, f"a{action}")
+                else:
+                    handler = sync_to_async(getattr(self, action))
+                response = await handler(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+            return self.finalize_response(request, response, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = {"get": action, "head": action}
+        return csrf_exempt(view)
+
+    def handles_async(self, request):
+        """Whether the ``a<action>`` handler covers this request."""
+        # Cursor pages are built by the sync paginator
+        return self.action != "list" or isinstance(
+            self.paginator, (PageNumberPagination, type(None))
+        )
+
+    async def afilter_queryset(self):
+        # Building querysets is lazy but may look up search backends
+        return await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given query."
+            )
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """``PageNumberPagination.paginate_queryset`` with awaited queries."""
+        pagination = self.paginator
+        page_size = pagination.get_page_size(self.request) if pagination else None
+        if not page_size:
+            return None
+        paginator = pagination.django_paginator_class(queryset, page_size)
+        # Known up front, so the sync Paginator never counts
+        paginator.count = await queryset.acount()
+        page_number = pagination.get_page_number(self.request, paginator)
+        try:
+            page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                pagination.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+        if paginator.num_pages > 1 and pagination.template is not None:
+            pagination.display_page_controls = True
+        pagination.page = page
+        pagination.request = self.request
+        return [obj async for obj in page.object_list]
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
@@ -0,0 +1,55 @@
+"""
+How Django holds PostgreSQL connections, selected with ``DB_POOL_MODE``.
+
+- "persistent": each worker keeps its connection for ``DB_CONN_MAX_AGE``
+  seconds and checks it is still alive before the first query of a request.
+  For long-running gunicorn workers.
+- "pool": each worker keeps a pool of up to ``DB_POOL_SIZE`` +
+  ``DB_POOL_MAX_OVERFLOW`` connections (django-db-connection-pool), pinged
+  when checked out. For threaded workers sharing a process.
+- "external": a connection per request to an external transaction pooler
+  (PgBouncer, or Supabase's on port 6543) that keeps the server connections
+  warm. For serverless deployments, whose frozen instances would otherwise
+  hold idle connections open.
+- "none": a fresh connection per request, Django's default.
+"""
+
+POOL_MODES = ("persistent", "pool", "external", "none")
+
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+POOLED_ENGINE = "dj_db_conn_pool.backends.postgresql"
+
+
+def database_settings(
+    database, mode, max_age=600, pool_size=10, max_overflow=10, recycle=900
+):
+    """Return a copy of a PostgreSQL ``DATABASES`` entry set up for ``mode``."""
+    if mode not in POOL_MODES:
+        raise ValueError(
+            f"Unknown DB_POOL_MODE {mode!r}; choose one of {', '.join(POOL_MODES)}."
+        )
+    database = {
+        **database,
+        "ENGINE": POSTGRESQL_ENGINE,
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": False,
+        # Transaction poolers hand each transaction a different server
+        # connection, so named cursors cannot outlive one
+        "DISABLE_SERVER_SIDE_CURSORS": mode == "external",
+    }
+    database.pop("POOL_OPTIONS", None)
+
+    if mode == "persistent":
+        database["CONN_MAX_AGE"] = max_age
+        database["CONN_HEALTH_CHECKS"] = True
+    elif mode == "pool":
+        # Django closes the connection after every request, which returns
+        # it to the pool rather than closing it
+        database["ENGINE"] = POOLED_ENGINE
+        database["POOL_OPTIONS"] = {
+            "POOL_SIZE": pool_size,
+            "MAX_OVERFLOW": max_overflow,
+            "RECYCLE": recycle,
+            "PRE_PING": True,
+        }
+    return database
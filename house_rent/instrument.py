@@ -0,0 +1,47 @@
+"""
+Database execute wrappers that follow the request instead of a connection.
+
+``connection.execute_wrapper()`` only sees queries on the calling thread's
+connection. Under ASGI the ORM runs queries on ``sync_to_async`` worker
+threads, which use their own connections, so request instrumentation
+installed that way misses them. ``watch_queries(wrapper)`` keeps the wrapper
+in a context variable instead, which asgiref copies into those threads, and
+every connection runs the wrappers of the context issuing the query.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+current_wrappers = ContextVar("query_wrappers", default=())
+
+
+def run_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(current_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    if run_wrappers not in connection.execute_wrappers:
+        # First, as connection.execute_wrapper() pops the last one on exit
+        connection.execute_wrappers.insert(0, run_wrappers)
+
+
+connection_created.connect(install, dispatch_uid="house_rent.instrument")
+
+
+@contextmanager
+def watch_queries(wrapper):
+    """Run ``wrapper`` around every query issued in this context."""
+    for alias in connections:
+        # Connections opened before this module was imported
+        install(connections[alias])
+    token = current_wrappers.set((*current_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        current_wrappers.reset(token)
@@ -0,0 +1,195 @@
+import random
+import time
+from contextlib import contextmanager, nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .instrument import watch_queries
+from .nplusone import detect_n_plus_one
+from .perf import RequestSample, current_sample, stats
+from .routers import read_from_replica, replicas
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return f"{request.method} <unresolved>"
+    return f"{request.method} {match.view_name or match._func_path}"
+
+
+def server_timing(total_ms, sample):
+    return ", ".join(
+        [
+            f'db;dur={sample.db_seconds * 1000:.2f};desc="{sample.queries} queries"',
+            f"serializer;dur={sample.serializer_seconds * 1000:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ]
+    )
+
+
+class PerfMiddleware(MiddlewareMixin):
+    """
+    Measure a ``PERF_SAMPLE_RATE`` share of requests (see ``house_rent.perf``)
+    and report them in a ``Server-Timing`` header and ``/api/admin/perf/``.
+    Unsampled requests cost one random() call.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, "PERF_SAMPLE_RATE", 0.0)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.measure(request) as finish:
+            return finish(self.get_response(request))
+
+    async def __acall__(self, request):
+        with self.measure(request) as finish:
+            return finish(await self.get_response(request))
+
+    @contextmanager
+    def measure(self, request):
+        """Yield a function that records the request given its response."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield lambda response: response
+            return
+
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        start = time.perf_counter()
+
+        def finish(response):
+            total_ms = (time.perf_counter() - start) * 1000
+            # Streamed bodies are produced after this returns and are not sized
+            size = None if response.streaming else len(response.content)
+            stats.record(
+                endpoint_name(request),
+                {
+                    "total_ms": total_ms,
+                    "db_ms": sample.db_seconds * 1000,
+                    "serializer_ms": sample.serializer_seconds * 1000,
+                    "queries": sample.queries,
+                    "response_bytes": size,
+                },
+            )
+            response["Server-Timing"] = server_timing(total_ms, sample)
+            return response
+
+        try:
+            with watch_queries(sample):
+                yield finish
+        finally:
+            current_sample.reset(token)
+
+
+class NPlusOneMiddleware(MiddlewareMixin):
+    """Report repeated same-shape queries per request (see house_rent.nplusone)."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.mode = getattr(settings, "NPLUSONE_MODE", "off")
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.detect(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.detect(request):
+            return await self.get_response(request)
+
+    def detect(self, request):
+        if self.mode == "off":
+            return nullcontext()
+        return detect_n_plus_one(f"{request.method} {request.path}", mode=self.mode)
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Let safe requests read from a replica (see ``house_rent.routers``).
+
+    A successful write sets a ``read_primary`` cookie for
+    ``REPLICA_STICKY_SECONDS`` so the writer's next reads see their changes
+    while replicas catch up. Clients that do not keep cookies can send
+    ``X-Read-Primary`` instead. ``REPLICA_PRIMARY_PATHS`` always read from the
+    primary. Streamed bodies are produced after this returns and read from
+    the primary.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+        self.primary_paths = tuple(getattr(settings, "REPLICA_PRIMARY_PATHS", ()))
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.reads(request):
+            return self.stick(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        with self.reads(request):
+            return self.stick(request, await self.get_response(request))
+
+    def reads(self, request):
+        if (
+            request.method not in SAFE_METHODS
+            or not replicas()
+            or READ_PRIMARY_COOKIE in request.COOKIES
+            or request.headers.get("X-Read-Primary")
+            or request.path.startswith(self.primary_paths)
+        ):
+            return nullcontext()
+        return read_from_replica()
+
+    def stick(self, request, response):
+        if (
+            request.method not in SAFE_METHODS
+            and replicas()
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                "1",
+                max_age=self.sticky_seconds,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs in async mode, so under ASGI the rest of the
+    stack is not pushed onto a thread. Files are still served from one.
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
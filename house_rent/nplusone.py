@@ -0,0 +1,119 @@
+"""
+N+1 query detection.
+
+Inside a request (see ``NPlusOneMiddleware``) or a ``detect_n_plus_one()``
+block every SELECT is reduced to its shape: the SQL with literals and IN
+lists collapsed. A shape that runs more than ``NPLUSONE_THRESHOLD`` times is
+a per-row lookup, and is reported with the serializer field being rendered
+and the innermost line of project code at the time. ``NPLUSONE_MODE``
+decides what a report does: "raise", "log" or "off".
+"""
+
+import logging
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.serializers import Serializer
+
+from .instrument import watch_queries
+
+logger = logging.getLogger(__name__)
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+SELECT_LIST = re.compile(r"^SELECT .*? FROM ")
+
+# Instrumentation wraps every view and serializer; its frames say nothing
+IGNORED_MODULES = {
+    __name__,
+    "house_rent.instrument",
+    "house_rent.middleware",
+    "house_rent.perf",
+}
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql):
+    shape = STRING.sub("?", sql).replace("%s", "?")
+    shape = NUMBER.sub("?", shape)
+    return PLACEHOLDER_LIST.sub("(...)", shape)
+
+
+def is_project_frame(frame):
+    filename = frame.f_code.co_filename
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and "site-packages" not in filename
+        and frame.f_globals.get("__name__") not in IGNORED_MODULES
+    )
+
+
+def find_origin(frame):
+    """Describe the serializer field and project line that issued a query."""
+    field = line = None
+    while frame is not None and not (field and line):
+        code = frame.f_code
+        serializer = frame.f_locals.get("self")
+        if (
+            field is None
+            and code.co_name == "to_representation"
+            and isinstance(serializer, Serializer)
+            and "field" in frame.f_locals
+        ):
+            # Serializer.to_representation is looping over its fields
+            field = f"{type(serializer).__name__}.{frame.f_locals['field'].field_name}"
+        if line is None and is_project_frame(frame):
+            path = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            line = f"{path}:{frame.f_lineno} in {code.co_name}"
+        frame = frame.f_back
+    return " at ".join(part for part in (field, line) if part) or "unknown origin"
+
+
+class NPlusOneDetector:
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with watch_queries(), so it sees every connection
+        if sql.lstrip()[:6].upper() == "SELECT":
+            shape = query_shape(sql)
+            count = self.counts[shape] = self.counts.get(shape, 0) + 1
+            if count == self.threshold + 1:
+                self.origins[shape] = find_origin(sys._getframe(1))
+        return execute(sql, params, many, context)
+
+    def problems(self):
+        return [
+            f"{self.counts[shape]} x {SELECT_LIST.sub('SELECT ... FROM ', shape)} "
+            f"(from {origin})"
+            for shape, origin in self.origins.items()
+        ]
+
+
+@contextmanager
+def detect_n_plus_one(label="", mode=None, threshold=None):
+    """Watch the queries run inside the block and report repeated shapes."""
+    mode = mode or getattr(settings, "NPLUSONE_MODE", "off")
+    if mode == "off":
+        yield None
+        return
+    detector = NPlusOneDetector(threshold or getattr(settings, "NPLUSONE_THRESHOLD", 5))
+    with watch_queries(detector):
+        yield detector
+
+    problems = detector.problems()
+    if not problems:
+        return
+    message = f"N+1 queries in {label or 'block'}:\n" + "\n".join(problems)
+    if mode == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
@@ -0,0 +1,168 @@
+"""
+In-process request metrics behind ``house_rent.middleware.PerfMiddleware``.
+
+Each sampled request records its SQL query count, database time, serializer
+time and response size under its resolved view. Values go into rolling
+histograms: fixed buckets per time window, summed over the last few windows
+when read, so memory stays constant however much traffic is recorded.
+Numbers are per process; with several workers each reports its own share.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+MS_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+QUERY_BUCKETS = [0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144]
+BYTE_BUCKETS = [2**n for n in range(10, 25, 2)]  # 1 KiB .. 16 MiB
+
+METRICS = {
+    "total_ms": MS_BUCKETS,
+    "db_ms": MS_BUCKETS,
+    "serializer_ms": MS_BUCKETS,
+    "queries": QUERY_BUCKETS,
+    "response_bytes": BYTE_BUCKETS,
+}
+
+# The sample of the request being handled, if it was picked for measuring
+current_sample = ContextVar("perf_sample", default=None)
+
+
+class RequestSample:
+    __slots__ = ("queries", "db_seconds", "serializer_seconds", "serializer_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with watch_queries(), so it sees every connection
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """
+    Add time spent in ``to_representation`` to the current sample. Only the
+    outermost serializer is timed, so nested and ``many=True`` children are
+    not counted twice. Lazy queries a serializer triggers count as both
+    serializer and database time.
+    """
+
+    def to_representation(self, instance):
+        sample = current_sample.get()
+        if sample is None or sample.serializer_depth:
+            return super().to_representation(instance)
+        sample.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            sample.serializer_seconds += time.perf_counter() - start
+            sample.serializer_depth -= 1
+
+
+class RollingHistogram:
+    def __init__(self, bounds, window_seconds, windows):
+        self.bounds = bounds
+        self.window_seconds = window_seconds
+        # One [window number, bucket counts, total, maximum] per slot
+        self.slots = [None] * windows
+
+    def record(self, value, now):
+        window = int(now // self.window_seconds)
+        index = window % len(self.slots)
+        slot = self.slots[index]
+        if slot is None or slot[0] != window:
+            slot = self.slots[index] = [window, [0] * (len(self.bounds) + 1), 0, 0]
+        slot[1][bisect_left(self.bounds, value)] += 1
+        slot[2] += value
+        slot[3] = max(slot[3], value)
+
+    def summary(self, now):
+        oldest = int(now // self.window_seconds) - len(self.slots) + 1
+        live = [slot for slot in self.slots if slot and slot[0] >= oldest]
+        counts = [sum(column) for column in zip(*(slot[1] for slot in live))]
+        count = sum(counts)
+        if not count:
+            return None
+        maximum = max(slot[3] for slot in live)
+        total = sum(slot[2] for slot in live)
+        return {
+            "count": count,
+            "mean": round(total / count, 2),
+            # Percentiles are bucket upper bounds
+            "p50": self.quantile(counts, count, 0.50, maximum),
+            "p95": self.quantile(counts, count, 0.95, maximum),
+            "p99": self.quantile(counts, count, 0.99, maximum),
+            "max": round(maximum, 2),
+            "total": round(total, 2),
+        }
+
+    def quantile(self, counts, count, fraction, maximum):
+        running = 0
+        for index, bucket in enumerate(counts):
+            running += bucket
+            if running >= fraction * count:
+                break
+        if index < len(self.bounds):
+            return min(self.bounds[index], round(maximum, 2))
+        return round(maximum, 2)
+
+
+class PerfStats:
+    def __init__(self, window_seconds=None, windows=None):
+        self.window_seconds = window_seconds or getattr(
+            settings, "PERF_WINDOW_SECONDS", 60
+        )
+        self.windows = windows or getattr(settings, "PERF_WINDOWS", 15)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, values, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            histograms = self._endpoints.get(endpoint)
+            if histograms is None:
+                histograms = self._endpoints[endpoint] = {
+                    metric: RollingHistogram(bounds, self.window_seconds, self.windows)
+                    for metric, bounds in METRICS.items()
+                }
+            for metric, value in values.items():
+                if value is not None:
+                    histograms[metric].record(value, now)
+
+    def snapshot(self, now=None):
+        """Per-endpoint summaries over the rolling period, costliest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            endpoints = []
+            for endpoint, histograms in self._endpoints.items():
+                summaries = {
+                    metric: histogram.summary(now)
+                    for metric, histogram in histograms.items()
+                }
+                if summaries["total_ms"] is None:
+                    continue  # Nothing recorded within the rolling period
+                requests = summaries["total_ms"]["count"]
+                endpoints.append(
+                    {"endpoint": endpoint, "requests": requests, **summaries}
+                )
+        endpoints.sort(key=lambda endpoint: endpoint["total_ms"]["total"], reverse=True)
+        return endpoints
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+stats = PerfStats()
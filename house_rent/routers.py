@@ -0,0 +1,92 @@
+"""
+Read replica routing.
+
+``ReplicaRoutingMiddleware`` lets safe requests read from one of the
+``DATABASE_REPLICAS`` aliases, picked once per request so every query sees
+the same replica. Everything else reads from the primary: unsafe requests,
+requests from clients that wrote recently (see the middleware), code inside
+``use_primary()``, atomic blocks, and the rest of a request once it has
+written. Writes always go to the primary.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = "default"
+
+
+class ReplicaReads:
+    __slots__ = ("alias", "pinned")
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.pinned = 0
+
+
+# Set for the duration of a request that may read from a replica
+current_reads = ContextVar("replica_reads", default=None)
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+@contextmanager
+def read_from_replica(alias=None):
+    """Let reads in the block use ``alias``, or a random configured replica."""
+    alias = alias or (random.choice(replicas()) if replicas() else None)
+    token = current_reads.set(ReplicaReads(alias) if alias else None)
+    try:
+        yield alias
+    finally:
+        current_reads.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send reads in the block, or the decorated function, to the primary."""
+    state = current_reads.get()
+    if state is None:
+        yield
+        return
+    state.pinned += 1
+    try:
+        yield
+    finally:
+        state.pinned -= 1
+
+
+def replica_in_use():
+    state = current_reads.get()
+    return state is not None and state.alias is not None and not state.pinned
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_in_use() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        if hints.get("instance") is not None:
+            return None  # Related lookups follow the instance's database
+        return current_reads.get().alias
+
+    def db_for_write(self, model, **hints):
+        state = current_reads.get()
+        if state is not None:
+            state.alias = None  # Read this request's own writes
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {PRIMARY, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
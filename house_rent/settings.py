@@ -1,9 +1,12 @@
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
 from corsheaders.defaults import default_headers
-from decouple import config
+from decouple import Csv, config
+
+from house_rent.database import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,6 +17,8 @@ SECRET_KEY = config("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config("DEBUG", default=False, cast=bool)
 
+TESTING = sys.argv[1:2] == ["test"]
+
 
 ALLOWED_HOSTS = [
     ".vercel.app",
@@ -42,6 +47,7 @@ CSRF_TRUSTED_ORIGINS = [
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "X-CSRF-Token",
     "X-Api-Version",
+    "X-Read-Primary",
     "content-type",
 ]
 
@@ -67,9 +73,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    "house_rent.middleware.PerfMiddleware",
+    "house_rent.middleware.NPlusOneMiddleware",
+    "house_rent.middleware.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # Whitenoise should be early
+    # Whitenoise should be early; this subclass also runs under ASGI
+    "house_rent.middleware.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -98,21 +109,49 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "house_rent.wsgi.application"
 
-# ? Database Configuration - Simplified for Supabase PostgreSQL
+# ? Database Configuration - Supabase PostgreSQL
+# DB_POOL_MODE picks how connections are kept (see house_rent/database.py):
+# "persistent" for gunicorn, "external" behind PgBouncer/Supabase's pooler on
+# serverless, "pool" for an in-process pool, "none" to connect per request.
+DB_POOL_MODE = config("DB_POOL_MODE", default="persistent")
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",  # Changed from pooled connection
-        "NAME": config("DB_NAME"),
-        "USER": config("DB_USER"),
-        "PASSWORD": config("DB_PASSWORD"),
-        "HOST": config("DB_HOST"),
-        "PORT": config("DB_PORT"),
-        "OPTIONS": {
-            "sslmode": "require",
-            "connect_timeout": 10,
+    "default": database_settings(
+        {
+            "NAME": config("DB_NAME"),
+            "USER": config("DB_USER"),
+            "PASSWORD": config("DB_PASSWORD"),
+            "HOST": config("DB_HOST"),
+            "PORT": config("DB_PORT"),
+            "OPTIONS": {
+                "sslmode": "require",
+                "connect_timeout": 10,
+            },
         },
-    }
+        DB_POOL_MODE,
+        max_age=config("DB_CONN_MAX_AGE", default=600, cast=int),
+        pool_size=config("DB_POOL_SIZE", default=10, cast=int),
+        max_overflow=config("DB_POOL_MAX_OVERFLOW", default=10, cast=int),
+    )
 }
+
+# Read replicas (house_rent.routers): safe requests read from one of these
+# hosts, which share the primary's name and credentials. A client that wrote
+# reads from the primary for REPLICA_STICKY_SECONDS afterwards.
+DB_REPLICA_HOSTS = config("DB_REPLICA_HOSTS", default="", cast=Csv())
+for index, host in enumerate(DB_REPLICA_HOSTS):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [f"replica_{index}" for index in range(len(DB_REPLICA_HOSTS))]
+if TESTING and not DATABASE_REPLICAS:
+    # Routing tests read through this mirror of the test database
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_ROUTERS = ["house_rent.routers.PrimaryReplicaRouter"]
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
+REPLICA_PRIMARY_PATHS = ["/api/auth/", "/admin/"]
+
 #! LOCAL DEV Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -124,6 +163,34 @@ DATABASES = {
 # }
 
 
+# Cache: per-process locmem by default. Point CACHE_BACKEND/CACHE_LOCATION at
+# a shared backend (e.g. django.core.cache.backends.redis.RedisCache) when
+# running several workers so invalidation reaches all of them.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="rentease"),
+    }
+}
+
+
+# Request metrics (house_rent.middleware.PerfMiddleware): share of requests
+# measured and reported at /api/admin/perf/ and in Server-Timing headers.
+# 0 turns measuring off; the histograms cover PERF_WINDOWS x
+# PERF_WINDOW_SECONDS of recent traffic.
+PERF_SAMPLE_RATE = config("PERF_SAMPLE_RATE", default=0.05, cast=float)
+PERF_WINDOW_SECONDS = 60
+PERF_WINDOWS = 15
+
+
+# N+1 query detection (house_rent.nplusone): "raise" fails the request,
+# "log" warns (staging), "off" skips it. The test suite runs with "raise".
+NPLUSONE_MODE = config("NPLUSONE_MODE", default="raise" if TESTING else "off")
+NPLUSONE_THRESHOLD = config("NPLUSONE_THRESHOLD", default=5, cast=int)
+
+
 # Custom User Model
 AUTH_USER_MODEL = "account.User"
 
@@ -175,7 +242,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework Settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "account.authentication.PrimaryJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
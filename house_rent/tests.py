@@ -0,0 +1,581 @@
+import asyncio
+import json
+import warnings
+from contextlib import ExitStack, contextmanager
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from interactions.models import Favorite, Review
+from properties.cache import RECENT_WRITE_KEY, bump_generation
+from properties.models import Category, House, HouseImage
+from properties.serializers import HouseDetailSerializer, HouseListSerializer
+
+from .database import database_settings
+from .middleware import READ_PRIMARY_COOKIE
+from .nplusone import NPlusOneError, detect_n_plus_one, query_shape
+from .perf import PerfStats, RequestSample, RollingHistogram, current_sample, stats
+from .routers import read_from_replica, use_primary
+
+User = get_user_model()
+
+
+class RollingHistogramTests(SimpleTestCase):
+    def test_summary_covers_only_recent_windows(self):
+        histogram = RollingHistogram([10, 100], window_seconds=60, windows=3)
+        for value in (5, 5, 50, 500):
+            histogram.record(value, now=0)
+        summary = histogram.summary(now=0)
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["p50"], 10)
+        self.assertEqual(summary["p95"], 500)
+        self.assertEqual(summary["max"], 500)
+
+        histogram.record(1, now=150)
+        self.assertEqual(histogram.summary(now=150)["count"], 5)
+        # The first window has rolled out of the three minute period
+        self.assertEqual(histogram.summary(now=185)["count"], 1)
+        self.assertIsNone(histogram.summary(now=400))
+
+    def test_stats_sort_costliest_endpoint_first(self):
+        perf = PerfStats(window_seconds=60, windows=2)
+        perf.record("GET cheap", {"total_ms": 1, "queries": 1}, now=0)
+        perf.record("GET slow", {"total_ms": 80, "queries": 9}, now=0)
+        snapshot = perf.snapshot(now=0)
+        self.assertEqual(
+            [row["endpoint"] for row in snapshot], ["GET slow", "GET cheap"]
+        )
+        self.assertEqual(snapshot[0]["queries"]["max"], 9)
+        self.assertIsNone(snapshot[0]["db_ms"])
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0)
+class PerfMiddlewareTests(APITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password123"
+        )
+        cls.admin.role = "admin"
+        cls.admin.save()
+        cls.user = User.objects.create_user(
+            username="user", email="user@example.com", password="password123"
+        )
+        category = Category.objects.create(name="Flat")
+        for i in range(3):
+            house = House.objects.create(
+                owner=cls.user,
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka",
+                price=Decimal("1000.00"),
+                approved=True,
+            )
+            house.categories.add(category)
+            HouseImage.replace_gallery(house, [{"url": "https://example.com/a.jpg"}])
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+
+    def test_sampled_requests_are_measured(self):
+        response = self.client.get(self.url)
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="[1-9]\d* queries", ')
+        self.assertIn("serializer;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+        (row,) = stats.snapshot()
+        self.assertEqual(row["endpoint"], "GET houses-list")
+        self.assertEqual(row["requests"], 1)
+        self.assertGreater(row["queries"]["max"], 0)
+        self.assertGreater(row["serializer_ms"]["max"], 0)
+        self.assertLessEqual(row["serializer_ms"]["max"], row["total_ms"]["max"])
+        self.assertEqual(row["response_bytes"]["max"], len(response.content))
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_left_alone(self):
+        response = self.client.get(self.url)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(stats.snapshot(), [])
+
+    def test_nested_serializers_are_timed_once(self):
+        sample = RequestSample()
+        token = current_sample.set(sample)
+        try:
+            HouseListSerializer(House.objects.all(), many=True).data
+        finally:
+            current_sample.reset(token)
+        self.assertEqual(sample.serializer_depth, 0)
+        self.assertGreater(sample.serializer_seconds, 0)
+
+    def test_admin_endpoint(self):
+        url = "/api/admin/perf/"
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["sample_rate"], 1.0)
+        endpoints = [row["endpoint"] for row in response.data["endpoints"]]
+        self.assertIn("GET houses-list", endpoints)
+
+        self.assertEqual(
+            self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT
+        )
+        # Only the DELETE itself has been recorded since the reset
+        self.assertEqual(
+            [row["endpoint"] for row in stats.snapshot()], ["DELETE admin-perf"]
+        )
+
+
+class NPlusOneDetectorTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="password123"
+        )
+        House.objects.bulk_create(
+            House(
+                owner=cls.owner,
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka",
+                price=Decimal("1000.00"),
+            )
+            for i in range(6)
+        )
+        Favorite.objects.bulk_create(
+            Favorite(user=cls.owner, house=house) for house in House.objects.all()
+        )
+
+    def test_query_shape_ignores_literals(self):
+        self.assertEqual(
+            query_shape("SELECT a FROM t WHERE id = 12 AND name = 'x''y' LIMIT 21"),
+            "SELECT a FROM t WHERE id = ? AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            query_shape("SELECT a FROM t WHERE id IN (%s, %s, %s)"),
+            query_shape("SELECT a FROM t WHERE id IN (%s)"),
+        )
+
+    def test_repeated_lookups_raise_with_their_origin(self):
+        houses = list(House.objects.all())
+        with self.assertRaises(NPlusOneError) as raised:
+            with detect_n_plus_one("loop", mode="raise", threshold=5):
+                for house in houses:
+                    house.owner.username
+        message = str(raised.exception)
+        self.assertIn('6 x SELECT ... FROM "account_user"', message)
+        self.assertIn("house_rent/tests.py", message)
+
+        with detect_n_plus_one("loop", mode="raise", threshold=5):
+            for house in House.objects.select_related("owner"):
+                house.owner.username
+
+    def test_serializer_fields_are_named(self):
+        with self.assertLogs("house_rent.nplusone", "WARNING") as logs:
+            with detect_n_plus_one("serializer", mode="log", threshold=5):
+                HouseDetailSerializer(House.objects.all(), many=True).data
+        self.assertIn("(from HouseDetailSerializer.owner at ", logs.output[0])
+
+    def test_middleware_fails_the_request(self):
+        self.client.force_authenticate(self.owner)
+        with override_settings(NPLUSONE_MODE="raise"):
+            self.assertEqual(
+                self.client.get("/api/interactions/favorites/").status_code, 200
+            )
+            with mock.patch(
+                "interactions.views.HouseDetailSerializer.eager_loading",
+                lambda queryset, prefix="": queryset,
+            ):
+                with self.assertRaises(NPlusOneError) as raised:
+                    self.client.get("/api/interactions/favorites/")
+        self.assertIn("GET /api/interactions/favorites/", str(raised.exception))
+
+    @override_settings(NPLUSONE_MODE="off")
+    def test_off_mode_skips_detection(self):
+        with detect_n_plus_one("loop") as detector:
+            for house in House.objects.all():
+                house.owner.username
+        self.assertIsNone(detector)
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    database = {"NAME": "rentease", "OPTIONS": {"sslmode": "require"}}
+
+    def test_persistent_connections_are_health_checked(self):
+        database = database_settings(self.database, "persistent", max_age=300)
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(database["CONN_MAX_AGE"], 300)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(database["OPTIONS"], {"sslmode": "require"})
+
+    def test_pool_mode_uses_the_pooled_backend(self):
+        database = database_settings(self.database, "pool", pool_size=4)
+        self.assertEqual(database["ENGINE"], "dj_db_conn_pool.backends.postgresql")
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["POOL_OPTIONS"]["POOL_SIZE"], 4)
+        self.assertTrue(database["POOL_OPTIONS"]["PRE_PING"])
+
+    def test_external_pooler_disables_server_side_cursors(self):
+        # Switching modes replaces every setting the previous mode made
+        pooled = database_settings(self.database, "pool")
+        database = database_settings(pooled, "external")
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertNotIn("POOL_OPTIONS", database)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            database_settings(self.database, "pgbouncer")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTests(APITransactionTestCase):
+    # The replica alias mirrors the test database; rows must be committed
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="password123"
+        )
+        self.admin = User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="password123",
+            role="admin",
+        )
+        self.house = House.objects.create(
+            owner=self.owner,
+            title="Replicated house",
+            description="A house",
+            location="Dhaka",
+            price=Decimal("1000.00"),
+            approved=True,
+        )
+
+    @contextmanager
+    def reads(self):
+        """Collect the alias of every SELECT run in the block."""
+        aliases = []
+
+        def recorder(alias):
+            def record(execute, sql, params, many, context):
+                if sql.lstrip().upper().startswith("SELECT"):
+                    aliases.append(alias)
+                return execute(sql, params, many, context)
+
+            return record
+
+        with ExitStack() as stack:
+            for alias in ("default", "replica"):
+                stack.enter_context(connections[alias].execute_wrapper(recorder(alias)))
+            yield aliases
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.client.force_authenticate(self.owner)
+        with self.reads() as aliases:
+            response = self.client.get("/api/properties/houses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["id"], self.house.pk)
+        self.assertEqual(set(aliases), {"replica"})
+
+    def test_writers_read_from_the_primary(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            "/api/interactions/favorites/", {"house_id": self.house.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.cookies[READ_PRIMARY_COOKIE]["max-age"], 10)
+
+        # The test client sends the cookie back
+        with self.reads() as aliases:
+            response = self.client.get("/api/interactions/favorites/")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(set(aliases), {"default"})
+
+        del self.client.cookies[READ_PRIMARY_COOKIE]
+        with self.reads() as aliases:
+            self.client.get("/api/interactions/favorites/", HTTP_X_READ_PRIMARY="1")
+        self.assertEqual(set(aliases), {"default"})
+
+    def test_pinned_views_read_from_the_primary(self):
+        self.client.force_authenticate(self.admin)
+        with self.reads() as aliases:
+            response = self.client.get("/api/properties/houses/moderation_queue/")
+            self.client.get("/api/auth/profile/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(aliases), {"default"})
+
+    def test_router_falls_back_to_the_primary(self):
+        with read_from_replica("replica"), self.reads() as aliases:
+            house = House.objects.get(pk=self.house.pk)
+            with transaction.atomic():
+                House.objects.count()
+            with use_primary():
+                House.objects.count()
+            self.assertEqual(aliases, ["replica", "default", "default"])
+
+            # A write sends the rest of the block to the primary, and rows
+            # read from the replica can be related to new ones
+            Review.objects.create(house=house, reviewer=self.owner, rating=4)
+            aliases.clear()
+            House.objects.count()
+            self.assertEqual(aliases, ["default"])
+        # Outside a request everything reads from the primary
+        self.assertEqual(House.objects.all().db, "default")
+
+    def test_cache_misses_right_after_a_write_fill_from_the_primary(self):
+        bump_generation()
+        with self.reads() as aliases:
+            self.client.get("/api/properties/houses/")
+        self.assertEqual(set(aliases), {"default"})
+
+        cache.delete(RECENT_WRITE_KEY)
+        with self.reads() as aliases:
+            response = self.client.get(
+                "/api/properties/houses/", {"ordering": "-price"}
+            )
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(set(aliases), {"replica"})
+
+
+class AsyncReadTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="password123"
+        )
+        cls.fan = User.objects.create_user(
+            username="fan", email="fan@example.com", password="password123"
+        )
+        category = Category.objects.create(name="Flat")
+        cls.houses = []
+        for i in range(4):
+            house = House.objects.create(
+                owner=cls.owner,
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka" if i % 2 else "Sylhet",
+                price=Decimal(1000 + i * 100),
+                approved=i < 3,
+            )
+            house.categories.add(category)
+            HouseImage.replace_gallery(house, [{"url": "https://example.com/a.jpg"}])
+            Review.objects.create(house=house, reviewer=cls.fan, rating=i + 1)
+            cls.houses.append(house)
+        for house in cls.houses[:2]:
+            Favorite.objects.create(user=cls.fan, house=house)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, params):
+        cache.clear()  # both views must build the response
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        if response.streaming:
+            body = json.loads(b"".join(response.streaming_content))
+        else:
+            body = response.json()
+        if isinstance(body, dict):
+            # Page links point at the path that was requested
+            body.pop("next", None)
+            body.pop("previous", None)
+        return response.status_code, body, len(ctx.captured_queries)
+
+    def assertSameAsSync(self, path, params=None):
+        sync = self.get(f"/api/{path}", params)
+        asynchronous = self.get(f"/api/{path.replace('/', '/async/', 1)}", params)
+        self.assertEqual(asynchronous, sync)
+        return asynchronous
+
+    def test_middleware_runs_async(self):
+        # One sync-only middleware would put the whole stack on a thread
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(import_string(path).async_capable, path)
+
+    def test_async_views_match_sync_views(self):
+        status_code, body, _ = self.assertSameAsSync("properties/houses/")
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body["count"], 3)
+        self.assertSameAsSync(
+            "properties/houses/",
+            {"location": "dhaka", "ordering": "-price", "page_size": 1, "page": 1},
+        )
+        self.assertSameAsSync("properties/houses/", {"page": 9})
+        self.assertSameAsSync(f"properties/houses/{self.houses[0].pk}/")
+        # Unapproved and missing houses
+        self.assertSameAsSync(f"properties/houses/{self.houses[3].pk}/")
+        self.assertSameAsSync("properties/houses/999999/")
+        self.assertSameAsSync("properties/categories/")
+        status_code, _, _ = self.assertSameAsSync("interactions/favorites/")
+        self.assertEqual(status_code, 401)
+
+        self.client.force_authenticate(self.fan)
+        status_code, body, _ = self.assertSameAsSync("interactions/favorites/")
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body["count"], 2)
+        # Only reads are served
+        response = self.client.post(
+            "/api/interactions/async/favorites/", {"house": self.houses[2].pk}
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_cursor_and_all_pages_fall_back_to_the_sync_view(self):
+        status_code, body, _ = self.assertSameAsSync(
+            "properties/houses/", {"cursor": "", "page_size": 2}
+        )
+        self.assertEqual(status_code, 200)
+        self.assertNotIn("count", body)  # cursor pages are never counted
+        self.assertEqual(len(body["results"]), 2)
+        status_code, body, _ = self.assertSameAsSync(
+            "properties/houses/", {"page": 1, "page_size": 2}
+        )
+        self.assertEqual(body["count"], 3)
+        self.assertEqual(len(body["results"]), 2)
+        status_code, body, _ = self.assertSameAsSync(
+            "properties/houses/", {"page": "all"}
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(body["count"], 3)
+        self.assertEqual(
+            [row["id"] for row in body["results"]],
+            [house.pk for house in self.houses[:3]],
+        )
+
+    def test_async_views_share_the_response_cache_and_validators(self):
+        url = "/api/properties/async/houses/"
+        first = self.client.get(url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+        self.assertEqual(
+            self.client.get("/api/properties/houses/")["ETag"], first["ETag"]
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    async def test_async_client(self):
+        # Serializers run on the event loop: a lazy query would raise
+        # SynchronousOnlyOperation and turn into a 500
+        response = await self.async_client.get("/api/properties/async/houses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 3)
+        response = await self.async_client.get(
+            f"/api/properties/async/houses/{self.houses[0].pk}/"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "House 0")
+
+    async def test_async_client_streams_chunk_by_chunk(self):
+        # Django reads a sync iterator into a list, with a warning, to send it
+        token = await sync_to_async(AccessToken.for_user)(self.owner)
+        requests = [
+            ("/api/properties/houses/", {"page": "all"}, {}),
+            ("/api/properties/async/houses/", {"page": "all"}, {}),
+            (
+                "/api/properties/houses/export/",
+                {"export_format": "csv"},
+                {"Authorization": f"Bearer {token}"},
+            ),
+        ]
+        for url, params, headers in requests:
+            with self.subTest(url=url), warnings.catch_warnings():
+                warnings.filterwarnings("error", "StreamingHttpResponse must")
+                response = await self.async_client.get(url, params, headers=headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.is_async)
+                chunks = [chunk async for chunk in response.streaming_content]
+                self.assertGreater(len(chunks), 1)
+                if "page" in params:
+                    body = json.loads(b"".join(chunks))
+                    self.assertEqual(body["count"], 3)
+                else:
+                    # A header row, then the owner's four houses
+                    self.assertEqual(len(b"".join(chunks).splitlines()), 5)
+
+
+@override_settings(
+    PERF_SAMPLE_RATE=1.0,
+    NPLUSONE_MODE="log",
+    NPLUSONE_THRESHOLD=0,  # report every query shape
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+)
+class AsgiInstrumentationTests(APITransactionTestCase):
+    # Under ASGI queries run on worker threads with their own connections,
+    # which only see committed rows
+
+    def get(self, path):
+        """GET ``path`` through the ASGI handler; return status and headers."""
+        application = get_asgi_application()
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+        }
+        response = {}
+
+        async def request():
+            sent = asyncio.Event()
+
+            async def receive():
+                if "start" not in response:
+                    response["start"] = True
+                    return {"type": "http.request", "body": b""}
+                await sent.wait()  # anything else reads as a disconnect
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["headers"] = {
+                        name.decode().lower(): value.decode()
+                        for name, value in message["headers"]
+                    }
+                elif not message.get("more_body"):
+                    sent.set()
+
+            await application(scope, receive, send)
+
+        asyncio.run(request())
+        return response["status"], response["headers"]
+
+    def test_queries_on_worker_threads_are_measured(self):
+        owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="password123"
+        )
+        House.objects.create(
+            owner=owner,
+            title="House",
+            description="A house",
+            location="Dhaka",
+            price=Decimal("1000.00"),
+            approved=True,
+        )
+        for path in ("/api/properties/async/houses/", "/api/properties/houses/"):
+            with self.assertLogs("house_rent.nplusone", "WARNING"):
+                status_code, headers = self.get(path)
+            self.assertEqual(status_code, 200)
+            self.assertRegex(headers["server-timing"], r'desc="[1-9]\d* queries"')
@@ -12,6 +12,8 @@ from rest_framework.routers import DefaultRouter
 
 from account.views import UserViewSet
 
+from .views import PerfStatsView
+
 router = DefaultRouter()
 
 
@@ -22,7 +24,7 @@ urlpatterns = [
     path("api/auth/", include("account.urls")),
     path("api/properties/", include("properties.urls")),
     path("api/interactions/", include("interactions.urls")),
-    # path("silk/", include("silk.urls", namespace="silk")),
+    path("api/admin/perf/", PerfStatsView.as_view(), name="admin-perf"),
     # Register the router URLs
     path("api/admin/", include(router.urls)),
     # YOUR PATTERNS
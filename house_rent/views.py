@@ -0,0 +1,29 @@
+from django.conf import settings
+from rest_framework import permissions, status, views
+from rest_framework.response import Response
+
+from .perf import stats
+
+
+class PerfStatsView(views.APIView):
+    """Per-endpoint request metrics recorded by PerfMiddleware (this process)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if request.user.role != "admin":
+            self.permission_denied(request, message="Not allowed.")
+
+    def get(self, request):
+        return Response(
+            {
+                "sample_rate": getattr(settings, "PERF_SAMPLE_RATE", 0.0),
+                "period_seconds": stats.window_seconds * stats.windows,
+                "endpoints": stats.snapshot(),
+            }
+        )
+
+    def delete(self, request):
+        stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
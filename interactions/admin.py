@@ -1,23 +1,35 @@
 from django.contrib import admin
 
-from .models import Favorite, RentRequest, Review
+from .models import Booking, Favorite, RentRequest, Review
 
 
 @admin.register(RentRequest)
 class RentRequestAdmin(admin.ModelAdmin):
     list_display = ("id", "tenant", "house", "status", "paid", "created_at")
     list_filter = ("status", "paid", "created_at")
-    search_fields = ("house__title", "requester__username")
+    list_select_related = ("tenant", "house")
+    search_fields = ("house__title", "tenant__username")
 
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ("house", "reviewer", "rating", "created_at")
     list_filter = ("rating", "created_at")
+    list_select_related = ("house", "reviewer")
     search_fields = ("house__title", "reviewer__username", "comment")
 
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ("user", "house", "created_at")
+    list_select_related = ("user", "house")
     search_fields = ("user__username", "house__title")
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ("house", "start", "end", "rent_request", "created_at")
+    list_filter = ("start",)
+    list_select_related = ("house", "rent_request__tenant", "rent_request__house")
+    search_fields = ("house__title",)
+    raw_id_fields = ("house", "rent_request")
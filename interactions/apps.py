@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class InteractionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'interactions'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .indexes import install_booking_schema
+
+        post_migrate.connect(install_booking_schema, sender=self)
@@ -0,0 +1,62 @@
+"""
+PostgreSQL-only booking constraints that Django models cannot declare
+portably. They are installed after ``migrate`` (see
+``InteractionsConfig.ready``).
+
+The exclusion constraint rejects overlapping bookings of one house at the
+database level, so two concurrent payments cannot both succeed. It needs the
+btree_gist extension. Without it, the GiST range index is still created and
+the application-level overlap check (under a row lock) stays the only guard.
+"""
+
+import logging
+
+from django.db import DatabaseError, connections
+
+from .models import Booking
+
+logger = logging.getLogger(__name__)
+
+BOOKING_TABLE = Booking._meta.db_table
+EXCLUSION_CONSTRAINT = "booking_no_overlap"
+
+POSTGRES_RANGE_SCHEMA = [
+    f"""
+    CREATE INDEX IF NOT EXISTS {BOOKING_TABLE}_period_gist
+    ON {BOOKING_TABLE} USING gist (tstzrange("start", "end", '[)'))
+    """,
+]
+
+POSTGRES_EXCLUSION_SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE {BOOKING_TABLE} ADD CONSTRAINT {EXCLUSION_CONSTRAINT}
+    EXCLUDE USING gist (house_id WITH =, tstzrange("start", "end", '[)') WITH &&)
+    """,
+]
+
+
+def install_booking_schema(using="default", **kwargs):
+    """post_migrate hook creating the PostgreSQL booking index and constraint."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+
+    schemas = [POSTGRES_RANGE_SCHEMA]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, BOOKING_TABLE)
+    if EXCLUSION_CONSTRAINT not in constraints:
+        schemas.append(POSTGRES_EXCLUSION_SCHEMA)
+
+    for statements in schemas:
+        try:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        except DatabaseError:
+            logger.warning(
+                "Could not install booking schema on %s; overlaps are only "
+                "checked by the application.",
+                using,
+                exc_info=True,
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from interactions.models import Booking
+from properties.cache import bump_generation
+from properties.models import House, ResourceVersion
+
+
+class Command(BaseCommand):
+    help = (
+        "Create bookings from the legacy House.booked_until timestamps that "
+        "are still in the future and not already covered by a booking."
+    )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Skip houses whose remaining legacy period already has bookings
+        booked = Booking.objects.filter(house=OuterRef("pk")).overlapping(
+            now, OuterRef("booked_until")
+        )
+        houses = House.objects.filter(booked_until__gt=now).exclude(Exists(booked))
+        bookings = Booking.objects.bulk_create(
+            Booking(house_id=house_id, start=now, end=booked_until)
+            for house_id, booked_until in houses.values_list("id", "booked_until")
+        )
+        if bookings:
+            ResourceVersion.bump(ResourceVersion.HOUSES)
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(bookings)} bookings."))
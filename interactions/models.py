@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from properties.models import House
 
@@ -20,11 +23,69 @@ class RentRequest(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     paid = models.BooleanField(default=False)
     duration = models.PositiveIntegerField(help_text="Duration in days", default=30)
+    # Requested move-in; None means as soon as the request is paid
+    start = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Duplicate request check on create
+            models.Index(
+                fields=["house", "tenant"], name="rentrequest_house_tenant_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"RentRequest by {self.tenant} for {self.house}"
 
+    def requested_period(self, now=None):
+        """The ``(start, end)`` this request would book if paid at ``now``."""
+        now = now or timezone.now()
+        start = max(self.start, now) if self.start else now
+        return start, start + timedelta(days=self.duration)
+
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, start, end):
+        """Bookings sharing any instant with the half-open period [start, end)."""
+        # end__gt first: the (house, end) index skips all finished history
+        return self.filter(end__gt=start, start__lt=end)
+
+
+class Booking(models.Model):
+    """A paid, half-open [start, end) stay that makes a house unavailable."""
+
+    house = models.ForeignKey(House, related_name="bookings", on_delete=models.CASCADE)
+    rent_request = models.OneToOneField(
+        RentRequest,
+        related_name="booking",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Overlap probes: house_id = ? AND end > ? AND start < ?
+            models.Index(
+                fields=["house", "end", "start"], name="booking_house_end_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end__gt=models.F("start")),
+                name="booking_end_after_start",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Booking of {self.house} from {self.start} to {self.end}"
+
 
 class Review(models.Model):
     house = models.ForeignKey(House, related_name="reviews", on_delete=models.CASCADE)
@@ -35,6 +96,14 @@ class Review(models.Model):
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Newest-first review pages and the detail view's recent reviews
+            models.Index(
+                fields=["house", "-created_at", "-id"], name="review_house_recent_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Review by {self.reviewer.username} on {self.house.title}"
 
@@ -49,6 +118,7 @@ class Favorite(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Also serves the per-user favorites list and add/remove lookups
         unique_together = ("user", "house")
 
     def __str__(self):
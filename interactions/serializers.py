@@ -1,14 +1,14 @@
-from django.utils import timezone
 from rest_framework import serializers
 
 from account.serializers import UserSerializer
+from house_rent.perf import TimedSerializerMixin
 from properties.models import House
 from properties.serializers import HouseDetailSerializer
 
 from .models import Favorite, RentRequest, Review
 
 
-class RentRequestSerializer(serializers.ModelSerializer):
+class RentRequestSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tenant = UserSerializer(read_only=True)
     duration = serializers.IntegerField(required=False, default=30)
     house_id = serializers.IntegerField(write_only=True)
@@ -25,6 +25,7 @@ class RentRequestSerializer(serializers.ModelSerializer):
             "status",
             "paid",
             "duration",
+            "start",
             "created_at",
         ]
         read_only_fields = [
@@ -42,9 +43,12 @@ class RentRequestSerializer(serializers.ModelSerializer):
         except House.DoesNotExist:
             raise serializers.ValidationError("House not found.")
 
-        if house.booked_until and house.booked_until > timezone.now():
+        requested = RentRequest(
+            start=data.get("start"), duration=data.get("duration", 30)
+        )
+        if house.bookings.overlapping(*requested.requested_period()).exists():
             raise serializers.ValidationError(
-                f"This house is already booked until {house.booked_until}."
+                "This house is already booked for the requested period."
             )
         return data
 
@@ -67,7 +71,7 @@ class RentRequestSerializer(serializers.ModelSerializer):
         return rent_request
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     reviewer = UserSerializer(read_only=True)
     house_id = serializers.IntegerField(write_only=True, required=False)
 
@@ -89,12 +93,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         house_id = self.context.get("house_id") or validated_data.pop("house_id", None)
         if not house_id:
             raise serializers.ValidationError("house_id is required.")
-        house = House.objects.get(id=house_id)
+        # Views that already loaded the house pass it to save a lookup
+        house = self.context.get("house") or House.objects.get(id=house_id)
         # Do not pass reviewer here because it’s already passed in via extra kwargs in save()
         return Review.objects.create(house=house, **validated_data)
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     house = HouseDetailSerializer(read_only=True)
     # (For standard POST, we won’t need body content if using URL, but we keep this for backwards compatibility)
     house_id = serializers.IntegerField(write_only=True, required=False)
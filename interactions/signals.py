@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from properties.cache import bump_generation
+from properties.models import House, HouseRatingSummary, ResourceVersion
+
+from .models import Booking, Review
+
+
+def deleted_with_house(origin):
+    """
+    True when a delete cascades from deleting houses, whose own post_delete
+    already invalidates reads and whose rating summary goes with them.
+    """
+    return isinstance(origin, House) or getattr(origin, "model", None) is House
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, **kwargs):
+    # Edits need the old house/rating to move the review between summaries
+    instance._previous_rating = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("house_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_summary(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    House.mark_updated([instance.house_id])
+    ResourceVersion.bump(ResourceVersion.HOUSES)
+    bump_generation()
+    previous = getattr(instance, "_previous_rating", None)
+    if not created and previous is not None:
+        if previous == (instance.house_id, instance.rating):
+            return
+        HouseRatingSummary.record_review(*previous, delta=-1)
+    HouseRatingSummary.record_review(instance.house_id, instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_summary(sender, instance, origin=None, **kwargs):
+    if deleted_with_house(origin):
+        return
+    HouseRatingSummary.record_review(instance.house_id, instance.rating, delta=-1)
+    House.mark_updated([instance.house_id])
+    ResourceVersion.bump(ResourceVersion.HOUSES)
+    bump_generation()
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_availability(sender, origin=None, **kwargs):
+    if deleted_with_house(origin):
+        return
+    # Availability filtered house lists change; the house payloads do not
+    ResourceVersion.bump(ResourceVersion.HOUSES)
+    bump_generation()
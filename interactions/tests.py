@@ -1,3 +1,170 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from properties.models import Category, House, HouseImage
+
+from .models import Booking, Favorite, RentRequest, Review
+
+User = get_user_model()
+
+
+class BookingTests(APITestCase):
+    url = "/api/interactions/rent-requests/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="password123"
+        )
+        cls.tenant = User.objects.create_user(
+            username="tenant", email="tenant@example.com", password="password123"
+        )
+        cls.house = House.objects.create(
+            owner=cls.owner,
+            title="House",
+            description="A house",
+            location="Dhaka",
+            price=Decimal("1000.00"),
+            approved=True,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.tenant)
+
+    def book(self, start, days):
+        return Booking.objects.create(
+            house=self.house, start=start, end=start + timedelta(days=days)
+        )
+
+    def test_request_is_rejected_when_period_is_booked(self):
+        start = timezone.now() + timedelta(days=10)
+        self.book(start, days=5)
+
+        response = self.client.post(
+            self.url, {"house_id": self.house.id, "duration": 30}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url,
+            {
+                "house_id": self.house.id,
+                "duration": 30,
+                "start": (start + timedelta(days=5)).isoformat(),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @mock.patch("interactions.views.stripe.PaymentIntent.create")
+    def test_pay_books_the_requested_period(self, create_intent):
+        create_intent.return_value = mock.Mock(client_secret="secret")
+        rent_request = RentRequest.objects.create(
+            house=self.house, tenant=self.tenant, status="approved", duration=7
+        )
+
+        response = self.client.post(f"{self.url}{rent_request.id}/pay/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        booking = Booking.objects.get(rent_request=rent_request)
+        self.assertEqual(booking.end - booking.start, timedelta(days=7))
+        rent_request.refresh_from_db()
+        self.assertTrue(rent_request.paid)
+
+    @mock.patch("interactions.views.stripe.PaymentIntent.create")
+    def test_pay_refuses_overlapping_period(self, create_intent):
+        self.book(timezone.now() - timedelta(days=1), days=3)
+        rent_request = RentRequest.objects.create(
+            house=self.house, tenant=self.tenant, status="approved"
+        )
+
+        response = self.client.post(f"{self.url}{rent_request.id}/pay/")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        create_intent.assert_not_called()
+        rent_request.refresh_from_db()
+        self.assertFalse(rent_request.paid)
+
+    @mock.patch(
+        "interactions.views.stripe.PaymentIntent.create",
+        side_effect=RuntimeError("card declined"),
+    )
+    def test_failed_charge_releases_the_booking(self, create_intent):
+        rent_request = RentRequest.objects.create(
+            house=self.house, tenant=self.tenant, status="approved"
+        )
+
+        response = self.client.post(f"{self.url}{rent_request.id}/pay/")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+
+
+class NPlusOneRegressionTests(APITestCase):
+    """List pages and admin changelists run with the N+1 detector raising."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username="user", email="user@example.com", password="password123"
+        )
+        owners = User.objects.bulk_create(
+            User(username=f"owner{i}", email=f"owner{i}@example.com") for i in range(8)
+        )
+        category = Category.objects.create(name="Flat")
+        for i, owner in enumerate(owners):
+            house = House.objects.create(
+                owner=owner,
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka",
+                price=Decimal("1000.00"),
+                approved=True,
+            )
+            house.categories.add(category)
+            HouseImage.replace_gallery(house, [{"url": "https://example.com/a.jpg"}])
+            Review.objects.create(house=house, reviewer=owners[i - 1], rating=4)
+            Favorite.objects.create(user=cls.user, house=house)
+            rent_request = RentRequest.objects.create(house=house, tenant=cls.user)
+            Booking.objects.create(
+                house=house,
+                rent_request=rent_request,
+                start=timezone.now(),
+                end=timezone.now() + timedelta(days=7),
+            )
+
+    @override_settings(NPLUSONE_MODE="raise")
+    def test_api_lists(self):
+        self.client.force_authenticate(self.user)
+        for url in (
+            "/api/interactions/favorites/",
+            "/api/interactions/rent-requests/",
+            "/api/interactions/reviews/",
+            "/api/properties/houses/",
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get("/api/interactions/favorites/")
+        self.assertEqual(len(response.data["results"][0]["house"]["images"]), 1)
+
+    @override_settings(NPLUSONE_MODE="raise")
+    def test_admin_changelists(self):
+        self.client.force_login(self.user)
+        for model in (
+            "interactions/rentrequest",
+            "interactions/review",
+            "interactions/favorite",
+            "interactions/booking",
+            "properties/house",
+        ):
+            with self.subTest(model=model):
+                response = self.client.get(f"/admin/{model}/")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -11,4 +11,10 @@ router.register(r"favorites", FavoriteViewSet, basename="favorites")
 
 urlpatterns = [
     path("", include(router.urls)),
+    # The same read as an async view, for ASGI servers (house_rent.async_api)
+    path(
+        "async/favorites/",
+        FavoriteViewSet.as_async_view("list", basename="favorites", detail=False),
+        name="favorites-async-list",
+    ),
 ]
@@ -1,27 +1,19 @@
 import stripe
 from django.conf import settings
-from django.db.models import Q
+from django.db import transaction
 from django.http import Http404
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from .models import Favorite, RentRequest, Review
-from .serializers import FavoriteSerializer, RentRequestSerializer, ReviewSerializer
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from house_rent.async_api import AsyncReadMixin
+from house_rent.routers import use_primary
+from properties.models import House
+from properties.serializers import HouseDetailSerializer
 
-import stripe
-from django.conf import settings
-from django.db.models import Q
-from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
-from rest_framework.response import Response
-
-from .models import RentRequest
-from .serializers import RentRequestSerializer
+from .models import Booking, Favorite, RentRequest, Review
+from .serializers import FavoriteSerializer, RentRequestSerializer, ReviewSerializer
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
@@ -35,8 +27,12 @@ class RentRequestViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.role == "admin" or user.is_superuser:
             return RentRequest.objects.select_related("house", "tenant").all()
+        # A UNION lets each side use its own index; an OR across the join
+        # to house__owner scans every rent request
+        sent = RentRequest.objects.filter(tenant=user).values("pk")
+        received = RentRequest.objects.filter(house__owner=user).values("pk")
         return RentRequest.objects.select_related("house", "tenant").filter(
-            Q(tenant=user) | Q(house__owner=user)
+            pk__in=sent.union(received)
         )
 
     def get_object(self):
@@ -54,7 +50,7 @@ class RentRequestViewSet(viewsets.ModelViewSet):
         rent_request = self.get_object()
         # Allow if current user is either the owner or admin.
         if (
-            request.user != rent_request.house.owner
+            request.user.pk != rent_request.house.owner_id
             and request.user.role != "admin"
             and not request.user.is_superuser
         ):
@@ -69,7 +65,7 @@ class RentRequestViewSet(viewsets.ModelViewSet):
     def reject(self, request, pk=None):
         rent_request = self.get_object()
         if (
-            request.user != rent_request.house.owner
+            request.user.pk != rent_request.house.owner_id
             and request.user.role != "admin"
             and not request.user.is_superuser
         ):
@@ -83,6 +79,7 @@ class RentRequestViewSet(viewsets.ModelViewSet):
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
+    @use_primary()
     def pay(self, request, pk=None):
         rent_req = self.get_object()
         if rent_req.tenant != request.user or rent_req.status != "approved":
@@ -90,34 +87,46 @@ class RentRequestViewSet(viewsets.ModelViewSet):
                 {"detail": "Not allowed to pay."}, status=status.HTTP_403_FORBIDDEN
             )
 
-        try:
-            intent = stripe.PaymentIntent.create(
-                amount=int(rent_req.house.price * 100),  # price in cents
-                currency="usd",
-                payment_method_types=["card"],
-                description=f"Payment for house: {rent_req.house.title}",
-            )
-            # Payment successful; mark rent request as paid.
-            rent_req.paid = True
-            rent_req.save(update_fields=["paid"])
-
-            # Book the house: calculate the booking end date.
-            duration_days = rent_req.duration  # duration provided in the rent request
-            rent_req.house.booked_until = timezone.now() + datetime.timedelta(
-                days=duration_days
-            )
-            rent_req.house.save(update_fields=["booked_until"])
-
+        if rent_req.paid:
             return Response(
-                {
-                    "detail": f"Payment successful. House booked until {rent_req.house.booked_until}.",
-                    "client_secret": intent.client_secret,
-                },
-                status=status.HTTP_200_OK,
+                {"detail": "Rent request is already paid."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+
+        try:
+            with transaction.atomic():
+                # Lock the house so concurrent payments check overlaps in turn
+                house = House.objects.select_for_update().get(pk=rent_req.house_id)
+                start, end = rent_req.requested_period()
+                if house.bookings.overlapping(start, end).exists():
+                    return Response(
+                        {"detail": "This house is already booked for that period."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                # Booked before charging so a failed charge rolls it back
+                booking = Booking.objects.create(
+                    house=house, rent_request=rent_req, start=start, end=end
+                )
+                intent = stripe.PaymentIntent.create(
+                    amount=int(house.price * 100),  # price in cents
+                    currency="usd",
+                    payment_method_types=["card"],
+                    description=f"Payment for house: {house.title}",
+                )
+                # Payment successful; mark rent request as paid.
+                rent_req.paid = True
+                rent_req.save(update_fields=["paid"])
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response(
+            {
+                "detail": f"Payment successful. House booked until {booking.end}.",
+                "client_secret": intent.client_secret,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class ReviewViewSet(viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
@@ -131,13 +140,17 @@ class ReviewViewSet(viewsets.ModelViewSet):
         serializer.save(reviewer=self.request.user)
 
 
-class FavoriteViewSet(viewsets.ModelViewSet):
+class FavoriteViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     serializer_class = FavoriteSerializer
     queryset = Favorite.objects.select_related("house", "user").all()
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            # Each favorite embeds the full house representation
+            queryset = HouseDetailSerializer.eager_loading(queryset, prefix="house__")
+        return queryset
 
     # Standard POST using JSON body is still supported.
     # Additionally, add custom actions to add/remove via URL.
@@ -146,8 +159,6 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     )
     def add(self, request, pk=None):
         # Here, pk is interpreted as the house id.
-        from properties.models import House
-
         try:
             house = House.objects.get(id=pk)
         except House.DoesNotExist:
@@ -169,8 +180,6 @@ class FavoriteViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def remove(self, request, pk=None):
-        from properties.models import House
-
         try:
             house = House.objects.get(id=pk)
         except House.DoesNotExist:
@@ -20,7 +20,7 @@ django.setup()
 
 from account.models import User
 from interactions.models import RentRequest, Review
-from properties.models import Category, House
+from properties.models import Category, House, HouseImage
 
 # Fixed image URLs
 HOUSE_IMAGE_URL = "https://i.ibb.co/VWgQBg65/house.jpg"
@@ -290,7 +290,6 @@ def create_houses():
         # Override the owner and price with random values
         data["owner"] = random.choice(users)
         data["price"] = round(random.uniform(500, 10000), 2)
-        data["images"] = HOUSE_IMAGE_URL
 
         # First 15 houses will be approved, the rest unapproved.
         approved = True if idx <= 15 else False
@@ -302,7 +301,6 @@ def create_houses():
                 "description": data["description"],
                 "location": data["location"],
                 "price": data["price"],
-                "images": data["images"],
                 "approved": approved,
             },
         )
@@ -311,6 +309,8 @@ def create_houses():
         num_cats = random.randint(1, min(3, len(available_categories)))
         chosen_categories = random.sample(available_categories, num_cats)
         house.categories.set(chosen_categories)
+        if created:
+            HouseImage.replace_gallery(house, [{"url": HOUSE_IMAGE_URL}])
         house.save()
 
         if created:
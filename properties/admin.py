@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, House
+from .models import Category, House, HouseImage
 
 
 @admin.register(Category)
@@ -9,9 +9,16 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 
+class HouseImageInline(admin.TabularInline):
+    model = HouseImage
+    extra = 0
+
+
 @admin.register(House)
 class HouseAdmin(admin.ModelAdmin):
     list_display = ("title", "owner", "location", "price", "approved", "created_at")
     list_filter = ("approved", "owner", "categories")
+    list_select_related = ("owner",)
     search_fields = ("title", "description", "location")
     ordering = ("-created_at",)
+    inlines = [HouseImageInline]
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'properties'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .indexes import install_indexes
+        from .search import install_search_schema
+
+        post_migrate.connect(install_indexes, sender=self)
+        post_migrate.connect(install_search_schema, sender=self)
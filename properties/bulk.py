@@ -0,0 +1,158 @@
+"""
+Bulk import and export of house listings (see ``HouseViewSet.bulk`` and
+``HouseViewSet.export``).
+
+Imports validate every row before writing anything, then insert houses,
+category links and images with one ``bulk_create`` per table and batch.
+Signals are not sent for bulk inserts, so the response cache and ETag
+version are bumped once at the end.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from .cache import bump_generation
+from .models import Category, House, HouseImage, ResourceVersion
+from .serializers import HouseImportSerializer
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 50
+
+EXPORT_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "location",
+    "latitude",
+    "longitude",
+    "price",
+    "approved",
+    "category_ids",
+    "images",
+]
+
+
+def validate_rows(rows):
+    """
+    Validate import rows in batches. Return ``(validated, errors)`` where
+    ``errors`` lists ``{"row": n, "errors": ...}`` with 1-based row numbers.
+    """
+    context = {"category_ids": set(Category.objects.values_list("id", flat=True))}
+    validated = []
+    errors = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        # many=True builds the row serializer's fields once per batch
+        serializer = HouseImportSerializer(
+            data=rows[start : start + BATCH_SIZE], many=True, context=context
+        )
+        if serializer.is_valid():
+            validated.extend(serializer.validated_data)
+            continue
+        batch_errors = serializer.errors
+        # Newer DRF reports list errors keyed by index, older as a list
+        if isinstance(batch_errors, dict):
+            batch_errors = batch_errors.items()
+        else:
+            batch_errors = enumerate(batch_errors)
+        for offset, row_errors in batch_errors:
+            if row_errors:
+                errors.append({"row": start + offset + 1, "errors": row_errors})
+    return validated, errors
+
+
+def import_houses(owner, validated):
+    """Create unapproved houses for ``owner`` from validated import rows."""
+    Membership = House.categories.through
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(validated), BATCH_SIZE):
+            batch = validated[start : start + BATCH_SIZE]
+            houses = []
+            for data in batch:
+                fields = {
+                    key: value
+                    for key, value in data.items()
+                    if key not in ("category_ids", "images")
+                }
+                house = House(owner=owner, approved=False, **fields)
+                house.refresh_derived_fields()
+                houses.append(house)
+            House.objects.bulk_create(houses)
+
+            Membership.objects.bulk_create(
+                Membership(house_id=house.pk, category_id=category_id)
+                for house, data in zip(houses, batch)
+                for category_id in data.get("category_ids", [])
+            )
+            HouseImage.objects.bulk_create(
+                image
+                for house, data in zip(houses, batch)
+                for image in HouseImage.build_gallery(house, data["images"])
+            )
+            created.extend(houses)
+
+    if created:
+        ResourceVersion.bump(ResourceVersion.HOUSES)
+        bump_generation()
+    return created
+
+
+def export_rows(queryset):
+    """Yield one dict per house in EXPORT_FIELDS, reading in batches."""
+    queryset = queryset.order_by("id").prefetch_related(
+        Prefetch("categories", queryset=Category.objects.only("id")), "gallery"
+    )
+    for house in queryset.iterator(chunk_size=BATCH_SIZE):
+        yield {
+            "id": house.pk,
+            "title": house.title,
+            "description": house.description,
+            "location": house.location,
+            "latitude": house.latitude,
+            "longitude": house.longitude,
+            "price": str(house.price),
+            "approved": house.approved,
+            "category_ids": [category.pk for category in house.categories.all()],
+            "images": [image.url for image in house.gallery.all()],
+        }
+
+
+def chunked(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def stream_jsonl(rows):
+    for chunk in chunked(rows):
+        yield b"".join(json.dumps(row).encode() + b"\n" for row in chunk)
+
+
+class _Echo:
+    """File-like object handing csv.writer's output straight back."""
+
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ",".join(map(str, value))
+    return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS).encode()
+    for chunk in chunked(rows):
+        lines = (
+            writer.writerow([csv_cell(row[field]) for field in EXPORT_FIELDS])
+            for row in chunk
+        )
+        yield "".join(lines).encode()
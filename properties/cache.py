@@ -0,0 +1,166 @@
+"""
+Response cache for anonymous and admin reads of houses and categories.
+
+Every key embeds a generation number, and any write that can change a cached
+response bumps it (see ``properties.signals``). Invalidation is therefore a
+single ``incr``: stale entries are never addressed again and simply expire.
+"""
+
+import hashlib
+import time
+from contextlib import nullcontext
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from house_rent.routers import replica_in_use, use_primary
+
+GENERATION_KEY = "properties:generation"
+RECENT_WRITE_KEY = "properties:recent-write"
+
+
+def get_cache():
+    return caches[getattr(settings, "PROPERTIES_CACHE_ALIAS", "default")]
+
+
+def current_generation():
+    cache = get_cache()
+    # Seed from the clock so an evicted counter cannot revive old entries
+    cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    return cache.get(GENERATION_KEY)
+
+
+def bump_generation():
+    """Invalidate every cached response."""
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    if getattr(settings, "DATABASE_REPLICAS", None):
+        cache.set(
+            RECENT_WRITE_KEY, True, getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+        )
+
+
+def fill_reads():
+    """
+    Where a cache miss reads from. Right after a write a replica may not have
+    it yet, and a response built from it would be cached under the new
+    generation; those misses read from the primary instead.
+    """
+    if replica_in_use() and get_cache().get(RECENT_WRITE_KEY):
+        return use_primary()
+    return nullcontext()
+
+
+async def afill_reads():
+    if replica_in_use() and await get_cache().aget(RECENT_WRITE_KEY):
+        return use_primary()
+    return nullcontext()
+
+
+def visibility_class(request):
+    """
+    Name the set of houses ``request.user`` can see, or None when the answer
+    is user specific (owners also see their own unapproved listings).
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return "public"
+    if user.role == "admin":
+        return "admin"
+    return None
+
+
+def response_cache_key(view, request, visibility):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = f"{view.basename}:{view.action}:{visibility}:{view.kwargs}:{query}"
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"properties:response:{current_generation()}:{digest}"
+
+
+class CachedReadMixin:
+    """
+    Cache successful responses of the actions listed in ``cache_timeouts``
+    (action name -> seconds). Wrap a handler with ``self.cached_response``,
+    or an async one with ``self.acached_response``.
+    """
+
+    cache_timeouts = {}
+
+    def get_cache_visibility(self, request):
+        return visibility_class(request)
+
+    def get_response_cache_key(self, request):
+        """The key this request's response is cached under, or None."""
+        visibility = self.get_cache_visibility(request)
+        # page=all is streamed and deliberately never held in memory
+        if (
+            self.cache_timeouts.get(self.action) is None
+            or visibility is None
+            or request.query_params.get("page") == "all"
+        ):
+            return None
+        return response_cache_key(self, request, visibility)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        cached = get_cache().get(key)
+        if cached is not None:
+            return cache_hit(request, cached)
+        with fill_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            get_cache().set(
+                key, cache_entry(response), self.cache_timeouts[self.action]
+            )
+            response["X-Cache"] = "MISS"
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        key = await sync_to_async(self.get_response_cache_key)(request)
+        if key is None:
+            return await handler(request, *args, **kwargs)
+
+        cached = await get_cache().aget(key)
+        if cached is not None:
+            return cache_hit(request, cached)
+        with await afill_reads():
+            response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await get_cache().aset(
+                key, cache_entry(response), self.cache_timeouts[self.action]
+            )
+            response["X-Cache"] = "MISS"
+        return response
+
+
+def cache_entry(response):
+    """What is cached for ``response``: its data and its validators."""
+    headers = {
+        name: response[name]
+        for name in ("ETag", "Last-Modified")
+        if response.has_header(name)
+    }
+    return response.data, headers
+
+
+def cache_hit(request, cached):
+    data, headers = cached
+    response = Response(data, headers={**headers, "X-Cache": "HIT"})
+    # Validators were stored with the body, so a hit can still 304
+    return get_conditional_response(
+        request,
+        etag=headers.get("ETag"),
+        last_modified=parse_http_date_safe(headers.get("Last-Modified")),
+        response=response,
+    )
@@ -0,0 +1,95 @@
+"""
+ETag / Last-Modified support for read endpoints.
+
+Views describe the current state of a resource with a cheap version (see
+``get_resource_version``) instead of its body, so a matching
+``If-None-Match`` or ``If-Modified-Since`` is answered with 304 before any
+serializer runs. Collections are versioned by ``ResourceVersion`` write
+counters (a primary key lookup, not an aggregate over the table), single
+houses by their ``updated_at``.
+"""
+
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import visibility_class
+
+
+def resource_version(*parts):
+    """Fold ``(version, updated_at)`` pairs into ``(version, last_modified)``."""
+    version = ";".join(f"{value}:{updated}" for value, updated in parts)
+    timestamps = [updated for _, updated in parts if updated is not None]
+    return version, max(timestamps, default=None)
+
+
+class ConditionalGetMixin:
+    def get_resource_version(self, request, *args, **kwargs):
+        """
+        Return ``(version, last_modified)`` for the resource this request
+        reads, or None to skip conditional handling. ``version`` is any
+        string that changes whenever the response body would.
+        """
+        return None
+
+    def get_etag(self, request, version):
+        audience = visibility_class(request) or f"user:{request.user.pk}"
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = f"{self.basename}:{self.action}:{audience}:{self.kwargs}:{query}"
+        return quote_etag(hashlib.md5(f"{raw}:{version}".encode()).hexdigest())
+
+    def conditional(self, handler):
+        """Wrap ``handler`` so it honours conditional request headers."""
+
+        @wraps(handler)
+        def respond(request, *args, **kwargs):
+            resource = self.get_resource_version(request, *args, **kwargs)
+            if resource is None:
+                return handler(request, *args, **kwargs)
+            etag, timestamp, not_modified = self.preconditions(request, resource)
+            if not_modified is not None:
+                return not_modified
+            response = handler(request, *args, **kwargs)
+            return add_validators(response, etag, timestamp)
+
+        return respond
+
+    def aconditional(self, handler):
+        """``conditional`` for async handlers."""
+
+        @wraps(handler)
+        async def respond(request, *args, **kwargs):
+            resource = await sync_to_async(self.get_resource_version)(
+                request, *args, **kwargs
+            )
+            if resource is None:
+                return await handler(request, *args, **kwargs)
+            etag, timestamp, not_modified = self.preconditions(request, resource)
+            if not_modified is not None:
+                return not_modified
+            response = await handler(request, *args, **kwargs)
+            return add_validators(response, etag, timestamp)
+
+        return respond
+
+    def preconditions(self, request, resource):
+        """Return the validators for ``resource`` and a 304 if they match."""
+        version, last_modified = resource
+        etag = self.get_etag(request, version)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        return etag, timestamp, not_modified
+
+
+def add_validators(response, etag, timestamp):
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+    return response
@@ -0,0 +1,161 @@
+"""
+Geospatial lookups without PostGIS.
+
+Houses store a geohash of their coordinates in an indexed column. A radius or
+bounding box query is first narrowed to the handful of geohash cells covering
+it, each of which is a prefix range on that index. Only the rows inside those
+cells are then checked against the exact box or great-circle distance.
+"""
+
+import math
+
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5 m cells
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Upper bound on the prefix ranges one query may OR together
+MAX_CELLS = 16
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """Return the ``(height, width)`` in degrees of a geohash cell."""
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180 / 2**lat_bits, 360 / 2**lng_bits
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng):
+    """
+    Return the geohash cells covering the box, at the finest precision that
+    needs at most MAX_CELLS of them, or None if even one-character cells
+    are too many (the box is then filtered on coordinates alone).
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        columns = math.floor(max_lng / width) - math.floor(min_lng / width) + 1
+        if rows * columns <= MAX_CELLS:
+            break
+    else:
+        return None
+
+    cells = set()
+    for row in range(rows):
+        latitude = (math.floor(min_lat / height) + row + 0.5) * height
+        for column in range(columns):
+            longitude = (math.floor(min_lng / width) + column + 0.5) * width
+            cells.add(
+                encode_geohash(
+                    min(max(latitude, -90.0), 90.0),
+                    min(max(longitude, -180.0), 180.0),
+                    precision,
+                )
+            )
+    return sorted(cells)
+
+
+def geohash_prefix_q(vendor, prefix):
+    if vendor == "postgresql":
+        # LIKE 'prefix%' uses the varchar_pattern_ops index Django adds
+        return Q(geohash__startswith=prefix)
+    # SQLite's LIKE is case-insensitive and skips the index; use a range
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(geohash__gte=prefix, geohash__lt=upper)
+
+
+def split_antimeridian(min_lng, max_lng):
+    """Boxes crossing 180° (min_lng > max_lng) are split in two."""
+    if min_lng <= max_lng:
+        return [(min_lng, max_lng)]
+    return [(min_lng, 180.0), (-180.0, max_lng)]
+
+
+def filter_bbox(queryset, min_lng, min_lat, max_lng, max_lat):
+    """Keep houses inside the box (edges included)."""
+    vendor = connections[queryset.db].vendor
+    match = Q(pk__in=[])
+    for west, east in split_antimeridian(min_lng, max_lng):
+        inside = Q(
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=west,
+            longitude__lte=east,
+        )
+        cells = covering_cells(min_lat, west, max_lat, east)
+        if cells:
+            index_ranges = Q(pk__in=[])
+            for cell in cells:
+                index_ranges |= geohash_prefix_q(vendor, cell)
+            inside &= index_ranges
+        match |= inside
+    return queryset.filter(match)
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance in km from the point to each house, as an expression."""
+    lat = Radians(F("latitude"))
+    lng = Radians(F("longitude"))
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+    lat_term = Power(Sin((lat - origin_lat) / 2), 2)
+    lng_term = Power(Sin((lng - origin_lng) / 2), 2)
+    half_chord = lat_term + math.cos(origin_lat) * Cos(lat) * lng_term
+    # Least() guards ASIN against rounding just above 1 for antipodes
+    return 2 * EARTH_RADIUS_KM * ASin(Least(Sqrt(half_chord), 1.0))
+
+
+def filter_near(queryset, latitude, longitude, radius_km):
+    """
+    Keep houses within ``radius_km`` of the point, annotated with
+    ``distance_km`` and ordered nearest first.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+    # Longitude degrees shrink towards the poles; widest at the box's edge
+    widest = max(abs(min_lat), abs(max_lat))
+    if widest >= 89.9:
+        min_lng, max_lng = -180.0, 180.0
+    else:
+        lng_delta = lat_delta / math.cos(math.radians(widest))
+        if lng_delta >= 180:
+            min_lng, max_lng = -180.0, 180.0
+        else:
+            min_lng = (longitude - lng_delta + 540) % 360 - 180
+            max_lng = (longitude + lng_delta + 540) % 360 - 180
+
+    queryset = filter_bbox(queryset, min_lng, min_lat, max_lng, max_lat)
+    return (
+        queryset.annotate(distance_km=distance_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by("distance_km", "id")
+    )
@@ -0,0 +1,36 @@
+"""
+Indexes that cannot be declared on a model.
+
+The auto-created ``House.categories`` through table only has a unique
+(house_id, category_id) index and single-column FK indexes, so category
+filters cannot go from a category to its houses using the index alone. The
+missing direction is added after ``migrate`` (see ``PropertiesConfig.ready``).
+"""
+
+import logging
+
+from django.db import DatabaseError, connections
+
+from .models import House
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_THROUGH_TABLE = House.categories.through._meta.db_table
+
+INDEX_SCHEMA = [
+    f"""
+    CREATE INDEX IF NOT EXISTS {CATEGORY_THROUGH_TABLE}_category_house
+    ON {CATEGORY_THROUGH_TABLE} (category_id, house_id)
+    """,
+]
+
+
+def install_indexes(using="default", **kwargs):
+    """post_migrate hook creating the indexes listed in INDEX_SCHEMA."""
+    connection = connections[using]
+    try:
+        with connection.cursor() as cursor:
+            for statement in INDEX_SCHEMA:
+                cursor.execute(statement)
+    except DatabaseError:
+        logger.warning("Could not install indexes on %s.", using, exc_info=True)
@@ -0,0 +1,248 @@
+import json
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from interactions.models import Favorite, RentRequest, Review
+from properties.cache import bump_generation
+from properties.models import Category, House
+
+User = get_user_model()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+class QueryTimer:
+    """
+    Count queries and time spent in the database. CaptureQueriesContext
+    cannot span client requests: request_started resets the query log.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main API endpoints in-process with the test client and report "
+        "p50/p95 latency, query counts and peak memory per endpoint. Runs against "
+        "the configured database, or a throwaway one seeded with --seed-houses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--only",
+            action="append",
+            default=[],
+            help="Only run endpoints whose name contains this (repeatable).",
+        )
+        parser.add_argument(
+            "--cached",
+            action="store_true",
+            help="Let the response cache serve repeats (default: always miss).",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Print p50 changes against a previous results file."
+        )
+        parser.add_argument(
+            "--seed-houses",
+            type=int,
+            help="Seed a throwaway test database with this many houses first.",
+        )
+        parser.add_argument("--seed-reviews-per-house", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not options["seed_houses"]:
+            return self.run(options)
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command(
+                "seed_load_data",
+                houses=options["seed_houses"],
+                reviews_per_house=options["seed_reviews_per_house"],
+                stdout=self.stdout,
+            )
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        endpoints = [
+            endpoint
+            for endpoint in self.endpoints(options["page_size"])
+            if not options["only"]
+            or any(part in endpoint[0] for part in options["only"])
+        ]
+        if not endpoints:
+            raise CommandError("No endpoints to run; seed data first.")
+
+        # The test client's host is not in production ALLOWED_HOSTS
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            results = [
+                self.measure(
+                    *endpoint, repeat=options["repeat"], cached=options["cached"]
+                )
+                for endpoint in endpoints
+            ]
+
+        report = {
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "repeat": options["repeat"],
+            "cached": options["cached"],
+            "dataset": {
+                "houses": House.objects.count(),
+                "reviews": Review.objects.count(),
+                "rent_requests": RentRequest.objects.count(),
+                "favorites": Favorite.objects.count(),
+            },
+            "endpoints": results,
+        }
+        if options["compare"]:
+            with open(options["compare"]) as fp:
+                self.compare(json.load(fp), report)
+        if options["output"]:
+            with open(options["output"], "w") as fp:
+                json.dump(report, fp, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def endpoints(self, page_size):
+        """Yield ``(name, path, params, user)`` for every benchmarked request."""
+        house = (
+            House.objects.filter(approved=True, rating_summary__isnull=False)
+            .order_by("-rating_summary__review_count")
+            .first()
+        )
+        if house is None:
+            return
+        category = Category.objects.order_by("id").first()
+        tenant = User.objects.filter(
+            pk__in=RentRequest.objects.values("tenant")[:1]
+        ).first()
+        fan = User.objects.filter(pk__in=Favorite.objects.values("user")[:1]).first()
+        today = timezone.localdate()
+
+        houses = "/api/properties/houses/"
+        filters = {
+            "default": {},
+            "search": {"search": house.title.split()[0]},
+            "category": {"category": category.pk if category else ""},
+            "price": {"min_price": 1000, "max_price": 5000},
+            "location": {"location": house.location.split(",")[0]},
+            "available": {
+                "available_from": (today + timedelta(days=30)).isoformat(),
+                "available_to": (today + timedelta(days=60)).isoformat(),
+            },
+            "near": {"near": f"{house.latitude},{house.longitude}", "radius_km": 5},
+            "ordering": {"ordering": "-price"},
+            "cursor": {"cursor": ""},
+        }
+        for name, params in filters.items():
+            params = {"page_size": page_size, **params}
+            yield f"houses.list.{name}", houses, params, None
+        yield "houses.facets", f"{houses}facets/", {}, None
+        yield "houses.detail", f"{houses}{house.pk}/", {}, None
+        yield "houses.reviews", f"{houses}{house.pk}/reviews/", {}, None
+        if tenant is not None:
+            yield "rent-requests.list", "/api/interactions/rent-requests/", {}, tenant
+        if fan is not None:
+            yield "favorites.list", "/api/interactions/favorites/", {}, fan
+
+    def measure(self, name, path, params, user, repeat, cached):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def request():
+            if not cached:
+                bump_generation()  # every request is a cache miss
+            response = client.get(path, params)
+            if response.status_code != 200:
+                raise CommandError(
+                    f"{name}: GET {path} returned {response.status_code}"
+                )
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+        request()  # warm up connections, URL resolver and caches
+        timings = []
+        db_timings = []
+        for _ in range(repeat):
+            queries = QueryTimer()
+            with connection.execute_wrapper(queries):
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            db_timings.append(queries.seconds * 1000)
+
+        # tracemalloc slows everything down, so memory gets its own run
+        tracemalloc.start()
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        result = {
+            "name": name,
+            "path": path,
+            "params": params,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "max_ms": round(max(timings), 2),
+            "queries": queries.count,
+            "db_p50_ms": round(statistics.median(db_timings), 2),
+            "peak_memory_kib": round(peak / 1024, 1),
+            "response_bytes": len(response.content) if not response.streaming else None,
+        }
+        self.stdout.write(
+            f"{name:<28} p50 {result['p50_ms']:>8.2f} ms  "
+            f"p95 {result['p95_ms']:>8.2f} ms  "
+            f"db {result['db_p50_ms']:>8.2f} ms  "
+            f"{result['queries']:>3} queries  "
+            f"peak {result['peak_memory_kib']:>9.1f} KiB"
+        )
+        return result
+
+    def compare(self, previous, report):
+        before = {endpoint["name"]: endpoint for endpoint in previous["endpoints"]}
+        self.stdout.write("Change in p50 against the previous run:")
+        for endpoint in report["endpoints"]:
+            old = before.get(endpoint["name"])
+            if not old or not old["p50_ms"]:
+                continue
+            change = (endpoint["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            self.stdout.write(
+                f"{endpoint['name']:<28} {old['p50_ms']:>8.2f} -> "
+                f"{endpoint['p50_ms']:>8.2f} ms ({change:+.0f}%), "
+                f"queries {old['queries']} -> {endpoint['queries']}"
+            )
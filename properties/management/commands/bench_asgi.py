@@ -0,0 +1,265 @@
+import asyncio
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from interactions.models import Favorite
+from properties.models import House
+
+from .bench_api import percentile
+
+User = get_user_model()
+
+MODES = ("wsgi", "asgi", "asgi-sync")
+HOST = "testserver"
+
+
+class QueryDelay:
+    """
+    Sleep before every query on every connection, including ones opened by
+    worker threads during the run, to stand in for a remote database.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.wrapped = []
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            # First, as connection.execute_wrapper() pops the last one on exit
+            connection.execute_wrappers.insert(0, self)
+            self.wrapped.append(connection)
+
+    def __enter__(self):
+        if self.seconds:
+            connection_created.connect(self.install)
+            for alias in connections:
+                self.install(connection=connections[alias])
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self.install)
+        for wrapper in self.wrapped:
+            wrapper.execute_wrappers.remove(self)
+        self.wrapped.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the read endpoints served by WSGI sync workers with the async "
+        "views under ASGI, in-process, with a simulated per-query database "
+        "latency. wsgi runs --workers requests at a time, like as many sync "
+        "worker processes; asgi keeps --concurrency requests in flight on one "
+        "event loop; asgi-sync serves the sync views under ASGI for reference."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=20.0,
+            help="Delay added to every query (default: 20).",
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=MODES,
+            help="Mode to run (repeatable, default: all).",
+        )
+        parser.add_argument(
+            "--seed-houses",
+            type=int,
+            help="Seed a throwaway test database with this many houses first.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["seed_houses"]:
+            return self.run(options)
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command(
+                "seed_load_data",
+                houses=options["seed_houses"],
+                reviews_per_house=5,
+                stdout=self.stdout,
+            )
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        requests = self.requests(options["requests"])
+        results = {}
+        # Every request reaches the database: no response cache, no throttling
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, HOST],
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            },
+        ), QueryDelay(options["latency_ms"] / 1000):
+            for mode in options["mode"] or MODES:
+                if mode == "wsgi":
+                    timings, seconds = self.run_wsgi(requests, options["workers"])
+                else:
+                    timings, seconds = asyncio.run(
+                        self.run_asgi(requests, options["concurrency"], mode == "asgi")
+                    )
+                results[mode] = len(timings) / seconds
+                self.stdout.write(
+                    f"{mode:<10} {len(timings) / seconds:>8.1f} req/s  "
+                    f"p50 {statistics.median(timings):>8.2f} ms  "
+                    f"p95 {percentile(timings, 95):>8.2f} ms"
+                )
+        if "wsgi" in results and "asgi" in results:
+            self.stdout.write(
+                f"asgi serves {results['asgi'] / results['wsgi']:.1f}x the "
+                f"requests per second of {options['workers']} wsgi workers"
+            )
+
+    def requests(self, count):
+        """``count`` requests as ``(sync path, async path, token)``."""
+        house = House.objects.filter(approved=True).order_by("id").first()
+        if house is None:
+            raise CommandError("No approved houses to request; seed data first.")
+        fan = User.objects.filter(pk__in=Favorite.objects.values("user")[:1]).first()
+
+        endpoints = [
+            ("/api/properties/houses/", "/api/properties/async/houses/", None),
+            (
+                f"/api/properties/houses/{house.pk}/",
+                f"/api/properties/async/houses/{house.pk}/",
+                None,
+            ),
+            (
+                "/api/properties/categories/",
+                "/api/properties/async/categories/",
+                None,
+            ),
+        ]
+        if fan is not None:
+            endpoints.append(
+                (
+                    "/api/interactions/favorites/",
+                    "/api/interactions/async/favorites/",
+                    str(AccessToken.for_user(fan)),
+                )
+            )
+        return [endpoints[i % len(endpoints)] for i in range(count)]
+
+    def expect_ok(self, status, path):
+        if status != 200:
+            raise CommandError(f"GET {path} returned {status}")
+
+    def run_wsgi(self, requests, workers):
+        application = get_wsgi_application()
+
+        def request(endpoint):
+            path, _, token = endpoint
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": "",
+                "SERVER_NAME": HOST,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": HOST,
+                "wsgi.input": io.BytesIO(),
+                "wsgi.url_scheme": "http",
+            }
+            if token:
+                environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            status = []
+            start = time.perf_counter()
+            body = application(environ, lambda line, headers: status.append(line))
+            try:
+                b"".join(body)
+            finally:
+                body.close()  # request_finished: returns the connection
+            elapsed = (time.perf_counter() - start) * 1000
+            self.expect_ok(int(status[0].split()[0]), path)
+            return elapsed
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(request, requests[:workers]))  # warm up
+            start = time.perf_counter()
+            timings = list(executor.map(request, requests))
+            seconds = time.perf_counter() - start
+            # Workers keep their connections open for CONN_MAX_AGE
+            executor.map(lambda _: connections.close_all(), range(workers))
+        return timings, seconds
+
+    async def run_asgi(self, requests, concurrency, use_async_views):
+        application = get_asgi_application()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def request(endpoint):
+            sync_path, async_path, token = endpoint
+            path = async_path if use_async_views else sync_path
+            headers = [(b"host", HOST.encode())]
+            if token:
+                headers.append((b"authorization", f"Bearer {token}".encode()))
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": headers,
+                "client": ("127.0.0.1", 0),
+                "server": (HOST, 80),
+            }
+            received = False
+            done = asyncio.Event()
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                # Django treats a second message as the client going away
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body"):
+                    done.set()
+
+            async with slots:
+                start = time.perf_counter()
+                await application(scope, receive, send)
+                elapsed = (time.perf_counter() - start) * 1000
+            self.expect_ok(status[0], path)
+            return elapsed
+
+        await asyncio.gather(*map(request, requests[:concurrency]))  # warm up
+        start = time.perf_counter()
+        timings = await asyncio.gather(*map(request, requests))
+        return timings, time.perf_counter() - start
@@ -0,0 +1,101 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+from house_rent.database import POOL_MODES, database_settings
+
+from .bench_api import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request connection overhead under each DB_POOL_MODE. Every "
+        "simulated request goes through the same connection lifecycle as Django's "
+        "request handler (close stale connections, run queries, close if not "
+        "persistent) and reports latency and how many server connections it "
+        "opened."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--queries", type=int, default=3, help="Queries per simulated request."
+        )
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=POOL_MODES,
+            help="Only measure this mode (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Connection pooling modes only apply to PostgreSQL.")
+        if options["requests"] < 1 or options["queries"] < 1:
+            raise CommandError("--requests and --queries must be positive.")
+
+        self.stdout.write(
+            f"{options['requests']} requests of {options['queries']} queries "
+            f"against {connection.settings_dict['HOST'] or 'localhost'}"
+        )
+        results = {}
+        for mode in options["mode"] or POOL_MODES:
+            result = results[mode] = self.measure(
+                mode, options["requests"], options["queries"]
+            )
+            self.stdout.write(
+                f"{mode:<12} p50 {result['p50_ms']:>7.2f} ms  "
+                f"p95 {result['p95_ms']:>7.2f} ms  "
+                f"{result['connections']:>4} server connections"
+            )
+        if "none" in results and "persistent" in results:
+            overhead = results["none"]["p50_ms"] - results["persistent"]["p50_ms"]
+            self.stdout.write(
+                f"Connecting per request adds {overhead:.2f} ms at p50 over "
+                "persistent connections."
+            )
+
+    def measure(self, mode, requests, queries):
+        alias = f"bench_{mode}"
+        database = settings.DATABASES[connection.alias]
+        max_age = database.get("CONN_MAX_AGE") or 600
+        # ConnectionHandler requires a "default" entry; it is never opened
+        handler = ConnectionHandler(
+            {
+                "default": database,
+                alias: database_settings(database, mode, max_age=max_age),
+            }
+        )
+        conn = handler[alias]
+        timings = []
+        backends = set()
+        try:
+            for _ in range(requests):
+                start = time.perf_counter()
+                conn.close_if_unusable_or_obsolete()  # request_started
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_backend_pid()")
+                    backends.add(cursor.fetchone()[0])
+                    for _ in range(queries - 1):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                conn.close_if_unusable_or_obsolete()  # request_finished
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            conn.close()
+            if mode == "pool":
+                from dj_db_conn_pool.core import pool_container
+
+                pool = pool_container.pop(alias, None)
+                if pool is not None:
+                    pool.dispose()
+
+        return {
+            "p50_ms": statistics.median(timings),
+            "p95_ms": percentile(timings, 95),
+            "connections": len(backends),
+        }
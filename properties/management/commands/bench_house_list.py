@@ -0,0 +1,143 @@
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+
+from interactions.models import Review
+from properties.models import House, HouseImage
+from properties.serializers import HouseListSerializer
+
+User = get_user_model()
+
+
+def primary_images():
+    return Prefetch(
+        "gallery",
+        queryset=HouseImage.objects.filter(is_primary=True).order_by(),
+        to_attr="primary_images",
+    )
+
+
+def legacy_list_queryset():
+    """The list queryset as it was before reviews stopped being prefetched."""
+    return (
+        House.objects.select_related("owner", "rating_summary")
+        .prefetch_related(
+            "categories",
+            primary_images(),
+            Prefetch(
+                "reviews",
+                queryset=Review.objects.select_related("reviewer").order_by(
+                    "-created_at"
+                ),
+            ),
+        )
+        .filter(approved=True)
+        .order_by("id")
+    )
+
+
+def current_list_queryset():
+    return (
+        House.objects.select_related("owner", "rating_summary")
+        .prefetch_related("categories", primary_images())
+        .filter(approved=True)
+        .order_by("id")
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare peak memory and latency of rendering one house list page with "
+        "and without the reviews prefetch. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--houses", type=int, default=100)
+        parser.add_argument("--reviews-per-house", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.seed(options["houses"], options["reviews_per_house"])
+            page_size = options["houses"]
+            for label, queryset in (
+                ("before (reviews prefetched)", legacy_list_queryset),
+                ("after (categories only)", current_list_queryset),
+            ):
+                self.report(label, queryset, page_size, options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, houses, reviews_per_house):
+        self.stdout.write(
+            f"Seeding {houses} houses with {reviews_per_house} reviews each..."
+        )
+        owner = User.objects.create_user(
+            username="bench_owner", email="bench_owner@example.com"
+        )
+        reviewers = User.objects.bulk_create(
+            User(username=f"bench_reviewer{i}", email=f"bench_reviewer{i}@example.com")
+            for i in range(50)
+        )
+        created = House.objects.bulk_create(
+            House(
+                owner=owner,
+                title=f"Bench house {i}",
+                description="Benchmark listing",
+                location="Dhaka, Bangladesh",
+                price=Decimal("1000.00"),
+                approved=True,
+            )
+            for i in range(houses)
+        )
+        HouseImage.objects.bulk_create(
+            HouseImage(
+                house=house, url="https://example.com/house.jpg", is_primary=True
+            )
+            for house in created
+        )
+        for house in created:
+            Review.objects.bulk_create(
+                (
+                    Review(
+                        house=house,
+                        reviewer=reviewers[i % len(reviewers)],
+                        rating=(i % 5) + 1,
+                        comment="Benchmark review " * 10,
+                    )
+                    for i in range(reviews_per_house)
+                ),
+                batch_size=1000,
+            )
+        call_command("rebuild_rating_summaries", stdout=self.stdout)
+
+    def render_page(self, queryset, page_size):
+        return HouseListSerializer(queryset()[:page_size], many=True).data
+
+    def report(self, label, queryset, page_size, repeat):
+        timings = []
+        peaks = []
+        for _ in range(repeat):
+            tracemalloc.start()
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                self.render_page(queryset, page_size)
+            timings.append((time.perf_counter() - start) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+            tracemalloc.stop()
+
+        self.stdout.write(
+            f"{label}: median {statistics.median(timings):.1f} ms, "
+            f"peak memory {max(peaks):.1f} MiB, "
+            f"{len(ctx.captured_queries)} queries"
+        )
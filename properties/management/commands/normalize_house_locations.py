@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.cache import bump_generation
+from properties.models import House, ResourceVersion
+
+
+class Command(BaseCommand):
+    help = "Backfill House.location_normalized for rows saved before it existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        batch = []
+        updated = 0
+        houses = House.objects.only("id", "location", "location_normalized")
+        for house in houses.iterator(chunk_size=batch_size):
+            before = house.location_normalized
+            house.refresh_derived_fields({"location"})
+            if house.location_normalized != before:
+                batch.append(house)
+            if len(batch) >= batch_size:
+                updated += self.update(batch)
+                batch = []
+        if batch:
+            updated += self.update(batch)
+
+        if updated:
+            ResourceVersion.bump(ResourceVersion.HOUSES)
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Normalized {updated} locations."))
+
+    def update(self, houses):
+        with transaction.atomic():
+            updated = House.objects.bulk_update(houses, ["location_normalized"])
+            House.mark_updated([house.pk for house in houses])
+        return updated
@@ -0,0 +1,63 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from interactions.models import Review
+from properties.bulk import chunked
+from properties.cache import bump_generation
+from properties.models import House, HouseRatingSummary, ResourceVersion
+
+
+class Command(BaseCommand):
+    help = "Rebuild every HouseRatingSummary row from the Review table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of summary rows written per INSERT.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        star_counts = {
+            field: Count("id", filter=Q(rating=star))
+            for star, field in enumerate(HouseRatingSummary.STAR_FIELDS, start=1)
+        }
+        rows = (
+            Review.objects.order_by()
+            .values("house_id")
+            .annotate(review_count=Count("id"), rating_sum=Sum("rating"), **star_counts)
+            .iterator(chunk_size=batch_size)
+        )
+        summaries = (
+            HouseRatingSummary(
+                average_rating=row["rating_sum"] / row["review_count"], **row
+            )
+            for row in rows
+        )
+
+        written = 0
+        with transaction.atomic():
+            # Houses losing their summary change too
+            stale = set(HouseRatingSummary.objects.values_list("house_id", flat=True))
+            HouseRatingSummary.objects.all().delete()
+            while batch := list(islice(summaries, batch_size)):
+                HouseRatingSummary.objects.bulk_create(batch)
+                house_ids = [summary.house_id for summary in batch]
+                House.mark_updated(house_ids)
+                stale.difference_update(house_ids)
+                written += len(batch)
+            for house_ids in chunked(stale, batch_size):
+                House.mark_updated(house_ids)
+
+        if written or stale:
+            ResourceVersion.bump(ResourceVersion.HOUSES)
+            bump_generation()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt rating summaries for {written} houses.")
+        )
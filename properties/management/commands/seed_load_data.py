@@ -0,0 +1,199 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from interactions.models import Favorite, RentRequest, Review
+from properties.bulk import chunked
+from properties.cache import bump_generation
+from properties.models import Category, House, HouseImage, ResourceVersion
+
+User = get_user_model()
+
+LOCATIONS = [
+    # (name, latitude, longitude)
+    ("Gulshan, Dhaka", 23.7925, 90.4078),
+    ("Dhanmondi, Dhaka", 23.7461, 90.3742),
+    ("Uttara, Dhaka", 23.8759, 90.3795),
+    ("Agrabad, Chittagong", 22.3282, 91.8123),
+    ("Zindabazar, Sylhet", 24.8949, 91.8687),
+    ("Sonadanga, Khulna", 22.8167, 89.5467),
+    ("Shaheb Bazar, Rajshahi", 24.3667, 88.6000),
+    ("Cox's Bazar", 21.4272, 92.0058),
+]
+PASSWORD = "password123"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large, realistic dataset for load testing with bulk inserts. "
+        "Houses are written in batches together with their categories, "
+        "images, reviews and rent requests, so memory stays flat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--houses", type=int, default=1000)
+        parser.add_argument("--reviews-per-house", type=int, default=5)
+        parser.add_argument("--requests-per-house", type=int, default=1)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument(
+            "--favorites-per-user",
+            type=int,
+            default=10,
+            help="Houses favorited by each seeded user.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Houses created per batch; related rows follow each batch.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="load",
+            help="Prefix of seeded usernames and category names.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}_user").exists():
+            raise CommandError(
+                f"Users named {prefix}_user* already exist; pass another --prefix."
+            )
+        self.random = random.Random(options["seed"])
+        started = time.perf_counter()
+
+        users = self.seed_users(prefix, max(options["users"], 1))
+        categories = Category.objects.bulk_create(
+            Category(name=f"{prefix} category {i}")
+            for i in range(options["categories"])
+        )
+
+        house_ids = []
+        for batch in chunked(range(options["houses"]), options["batch_size"]):
+            with transaction.atomic():
+                houses = self.seed_houses(batch, users, categories)
+                self.seed_reviews(houses, users, options["reviews_per_house"])
+                self.seed_rent_requests(houses, users, options["requests_per_house"])
+            house_ids.extend(house.pk for house in houses)
+            self.stdout.write(f"  {len(house_ids)} houses")
+
+        self.seed_favorites(users, house_ids, options["favorites_per_user"])
+        call_command("rebuild_rating_summaries", stdout=self.stdout)
+
+        # Bulk inserts send no signals; invalidate cached reads once
+        ResourceVersion.bump(ResourceVersion.HOUSES)
+        ResourceVersion.bump(ResourceVersion.CATEGORIES)
+        bump_generation()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(users)} users and {len(house_ids)} houses in "
+                f"{time.perf_counter() - started:.1f}s "
+                f"(password for {prefix}_user*: {PASSWORD})."
+            )
+        )
+
+    def seed_users(self, prefix, count):
+        # Hashing is deliberately slow; every seeded user shares one hash
+        password = make_password(PASSWORD)
+        return User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefix}_user{i}",
+                    email=f"{prefix}_user{i}@example.com",
+                    password=password,
+                    is_email_verified=True,
+                )
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
+
+    def seed_houses(self, numbers, users, categories):
+        houses = []
+        for i in numbers:
+            location, latitude, longitude = self.random.choice(LOCATIONS)
+            house = House(
+                owner=users[i % len(users)],
+                title=f"Load test house {i}",
+                description="Seeded listing for load tests. " * 5,
+                location=location,
+                latitude=latitude + self.random.uniform(-0.05, 0.05),
+                longitude=longitude + self.random.uniform(-0.05, 0.05),
+                price=Decimal(self.random.randrange(100, 20000)),
+                approved=self.random.random() < 0.9,
+            )
+            house.refresh_derived_fields()
+            houses.append(house)
+        House.objects.bulk_create(houses)
+
+        Membership = House.categories.through
+        if categories:
+            Membership.objects.bulk_create(
+                Membership(house_id=house.pk, category_id=category.pk)
+                for house in houses
+                for category in self.random.sample(
+                    categories, min(len(categories), self.random.randint(1, 3))
+                )
+            )
+        HouseImage.objects.bulk_create(
+            HouseImage(
+                house=house,
+                url=f"https://example.com/houses/{house.pk}/{position}.jpg",
+                position=position,
+                is_primary=position == 0,
+            )
+            for house in houses
+            for position in range(3)
+        )
+        return houses
+
+    def seed_reviews(self, houses, users, per_house):
+        reviews = (
+            Review(
+                house=house,
+                reviewer=self.random.choice(users),
+                rating=self.random.randint(1, 5),
+                comment="Seeded review. " * 8,
+            )
+            for house in houses
+            for _ in range(per_house)
+        )
+        for batch in chunked(reviews, 5000):
+            Review.objects.bulk_create(batch)
+
+    def seed_rent_requests(self, houses, users, per_house):
+        now = timezone.now()
+        statuses = [value for value, _ in RentRequest.STATUS_CHOICES]
+        RentRequest.objects.bulk_create(
+            RentRequest(
+                house=house,
+                tenant=self.random.choice(users),
+                message="Seeded request",
+                status=self.random.choice(statuses),
+                duration=self.random.choice([7, 30, 90]),
+                start=now + timedelta(days=self.random.randint(1, 365)),
+            )
+            for house in houses
+            for _ in range(per_house)
+        )
+
+    def seed_favorites(self, users, house_ids, per_user):
+        per_user = min(per_user, len(house_ids))
+        favorites = (
+            Favorite(user=user, house_id=house_id)
+            for user in users
+            for house_id in self.random.sample(house_ids, per_user)
+        )
+        for batch in chunked(favorites, 5000):
+            Favorite.objects.bulk_create(batch)
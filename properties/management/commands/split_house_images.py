@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from properties.cache import bump_generation
+from properties.models import House, HouseImage, ResourceVersion, split_image_urls
+
+
+class Command(BaseCommand):
+    help = (
+        "Create HouseImage rows from the legacy comma separated House.images "
+        "column. Houses that already have a gallery are left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        houses = (
+            House.objects.exclude(images="")
+            .filter(gallery__isnull=True)
+            .only("id", "images")
+        )
+        batch = []
+        split = 0
+        for house in houses.iterator(chunk_size=batch_size):
+            batch.append(house)
+            if len(batch) >= batch_size:
+                split += self.split(batch)
+                batch = []
+        if batch:
+            split += self.split(batch)
+
+        if split:
+            ResourceVersion.bump(ResourceVersion.HOUSES)
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Split images of {split} houses."))
+
+    def split(self, houses):
+        rows = []
+        for house in houses:
+            images = [{"url": url} for url in split_image_urls(house.images)]
+            rows.extend(HouseImage.build_gallery(house, images))
+        with transaction.atomic():
+            HouseImage.objects.bulk_create(rows)
+            House.mark_updated([house.pk for house in houses])
+        return len(houses)
@@ -1,10 +1,21 @@
 from django.conf import settings
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .geo import encode_geohash
+
+
+def normalize_location(value):
+    return " ".join((value or "").split()).lower()
 
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -17,12 +28,235 @@ class House(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     location = models.CharField(max_length=255)
+    # Lowercased, whitespace-collapsed copy of location used for indexed lookups
+    location_normalized = models.CharField(
+        max_length=255, db_index=True, editable=False, default=""
+    )
+    latitude = models.FloatField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Geohash of the coordinates ("" without them); its prefixes are map cells
+    geohash = models.CharField(max_length=12, db_index=True, editable=False, default="")
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    images = models.TextField(help_text="Comma separated image URLs")
+    # Legacy comma separated URLs, superseded by HouseImage rows (see the
+    # split_house_images command); no longer read or written by the API
+    images = models.TextField(blank=True, default="")
     categories = models.ManyToManyField("Category", related_name="houses")
     approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
-    booked_until = models.DateTimeField(blank=True, null=True)  # New field
+    # Bumped on every change to the listing or its reviews; drives ETags
+    updated_at = models.DateTimeField(auto_now=True)
+    # Legacy; superseded by interactions.Booking (see import_booked_until)
+    booked_until = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Public list pages: WHERE approved ORDER BY id LIMIT n
+            models.Index(
+                fields=["id"],
+                condition=models.Q(approved=True),
+                name="house_approved_id_idx",
+            ),
+            # min_price / max_price filters and ?ordering=price on the public list
+            models.Index(fields=["approved", "price"], name="house_approved_price_idx"),
+            # ?ordering=created_at on the public list
+            models.Index(
+                fields=["approved", "created_at"], name="house_approved_created_idx"
+            ),
+            # Admin moderation queue: WHERE NOT approved ORDER BY created_at, id
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(approved=False),
+                name="house_pending_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        derived = self.refresh_derived_fields(update_fields)
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *derived, "updated_at"}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def mark_updated(cls, pks):
+        """Bump updated_at for related-object changes that skip save()."""
+        cls.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+    @classmethod
+    def set_approved(cls, pks, approved):
+        """
+        Approve or reject houses in one UPDATE and return how many changed.
+        Like any queryset update this sends no signals.
+        """
+        return (
+            cls.objects.filter(pk__in=pks)
+            .exclude(approved=approved)
+            .update(approved=approved, updated_at=timezone.now())
+        )
+
+    def refresh_derived_fields(self, changed=None):
+        """
+        Recompute columns derived from user input whose source fields are in
+        ``changed`` (all of them when None) and return their names. Call this
+        before bulk_create/bulk_update, which bypass save().
+        """
+        refreshed = set()
+        if changed is None or "location" in changed:
+            self.location_normalized = normalize_location(self.location)
+            refreshed.add("location_normalized")
+        if changed is None or {"latitude", "longitude"} & set(changed):
+            located = self.latitude is not None and self.longitude is not None
+            self.geohash = (
+                encode_geohash(self.latitude, self.longitude) if located else ""
+            )
+            refreshed.add("geohash")
+        return refreshed
+
+
+def split_image_urls(value):
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+class HouseImage(models.Model):
+    house = models.ForeignKey(House, related_name="gallery", on_delete=models.CASCADE)
+    url = models.URLField(max_length=2048)
+    position = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    is_primary = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["position", "id"]
+        indexes = [models.Index(fields=["house", "position"])]
+        constraints = [
+            # Also the index behind the list thumbnail lookup
+            models.UniqueConstraint(
+                fields=["house"],
+                condition=models.Q(is_primary=True),
+                name="unique_primary_house_image",
+            )
+        ]
+
+    def __str__(self):
+        return self.url
+
+    @classmethod
+    def build_gallery(cls, house, images):
+        """
+        Return unsaved rows for ``images`` (dicts of HouseImage fields) in
+        order. The first image flagged primary wins, else the first image.
+        """
+        rows = [
+            cls(house=house, position=position, **{**image, "is_primary": False})
+            for position, image in enumerate(images)
+        ]
+        if rows:
+            flagged = [i for i, image in enumerate(images) if image.get("is_primary")]
+            rows[flagged[0] if flagged else 0].is_primary = True
+        return rows
+
+    @classmethod
+    def replace_gallery(cls, house, images):
+        """Swap the house's gallery for ``images``; the caller saves the house."""
+        with transaction.atomic():
+            cls.objects.filter(house=house).delete()
+            return cls.objects.bulk_create(cls.build_gallery(house, images))
+
+
+class HouseRatingSummary(models.Model):
+    """Denormalized review stats for a house, kept current by review signals."""
+
+    STAR_FIELDS = ("stars_1", "stars_2", "stars_3", "stars_4", "stars_5")
+
+    house = models.OneToOneField(
+        House,
+        primary_key=True,
+        related_name="rating_summary",
+        on_delete=models.CASCADE,
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(blank=True, null=True, db_index=True)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Rating summary for house {self.house_id}"
+
+    @property
+    def histogram(self):
+        return {
+            str(star): getattr(self, field)
+            for star, field in enumerate(self.STAR_FIELDS, start=1)
+        }
+
+    @classmethod
+    def record_review(cls, house_id, rating, delta=1):
+        """Add (delta=1) or remove (delta=-1) one rating with a single UPDATE."""
+        changes = {
+            "review_count": F("review_count") + delta,
+            "rating_sum": F("rating_sum") + delta * rating,
+            # F() reads the pre-update values, so apply the delta here as well
+            "average_rating": Case(
+                When(review_count=-delta, then=Value(None)),
+                default=ExpressionWrapper(
+                    Cast(F("rating_sum") + delta * rating, models.FloatField())
+                    / (F("review_count") + delta),
+                    output_field=models.FloatField(),
+                ),
+            ),
+        }
+        if 1 <= rating <= len(cls.STAR_FIELDS):
+            star_field = cls.STAR_FIELDS[rating - 1]
+            changes[star_field] = F(star_field) + delta
+
+        summaries = cls.objects.filter(house_id=house_id)
+        with transaction.atomic():
+            if summaries.update(**changes) or delta < 0:
+                # Never create a row on removal: the house may be mid-delete
+                return
+            cls.objects.get_or_create(house_id=house_id)
+            summaries.update(**changes)
+
+
+class ResourceVersion(models.Model):
+    """Write counter per API resource, read by conditional GETs in one lookup."""
+
+    HOUSES = "houses"
+    CATEGORIES = "categories"
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def bump(cls, name):
+        changes = {"version": F("version") + 1, "updated_at": timezone.now()}
+        if not cls.objects.filter(name=name).update(**changes):
+            cls.objects.get_or_create(name=name, defaults={"version": 1})
+
+    @classmethod
+    def current(cls, *names):
+        """Return ``{name: (version, updated_at)}``; unseen names are (0, None)."""
+        found = {
+            row.name: (row.version, row.updated_at)
+            for row in cls.objects.filter(name__in=names)
+        }
+        return {name: found.get(name, (0, None)) for name in names}
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -13,3 +13,32 @@ class CustomPageNumberPagination(PageNumberPagination):
             return None
 
         return super().paginate_queryset(queryset, request, view)
+
+
+class CustomCursorPagination(CursorPagination):
+    """Keyset pagination: constant cost per page at any depth, no COUNT(*)."""
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+
+    def get_ordering(self, request, queryset, view):
+        # Must be a stable, unique ordering; views pick it via cursor_ordering
+        return getattr(view, "cursor_ordering", self.ordering)
+
+
+class ReviewCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class ModerationQueuePagination(CursorPagination):
+    """Oldest pending listings first, matching house_pending_created_idx."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("created_at", "id")
@@ -0,0 +1,47 @@
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class JSONLinesParser(BaseParser):
+    """One JSON object per line; blank lines are skipped."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        rows = []
+        for number, line in enumerate(codecs.getreader(encoding)(stream), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                raise ParseError(f"Line {number}: JSON parse error - {exc}")
+            if not isinstance(row, dict):
+                raise ParseError(f"Line {number}: expected a JSON object.")
+            rows.append(row)
+        return rows
+
+
+class CSVParser(BaseParser):
+    """CSV with a header row; empty cells are treated as missing."""
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name == "utf-8":
+            encoding = "utf-8-sig"  # Spreadsheet exports often start with a BOM
+        reader = csv.DictReader(codecs.getreader(encoding)(stream))
+        try:
+            return [
+                {key: value for key, value in row.items() if key and value}
+                for row in reader
+            ]
+        except csv.Error as exc:
+            raise ParseError(f"Line {reader.line_num}: CSV parse error - {exc}")
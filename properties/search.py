@@ -0,0 +1,202 @@
+"""
+Full-text search over house listings.
+
+PostgreSQL gets a generated ``tsvector`` column with a GIN index (plus a
+trigram index for location lookups), SQLite gets an FTS5 table kept in sync
+by triggers. Both are created after ``migrate``
+(see ``PropertiesConfig.ready``) and are invisible to the ORM models. Other
+backends fall back to ``icontains`` matching.
+"""
+
+import logging
+import re
+
+from django.db import DatabaseError, connections
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import Expression, RawSQL
+from django.db.models.fields import Field
+
+from .models import House
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERMS = 8
+
+HOUSE_TABLE = House._meta.db_table
+FTS_TABLE = f"{HOUSE_TABLE}_fts"
+
+POSTGRES_SCHEMA = [
+    f"""
+    ALTER TABLE {HOUSE_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(location, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS {HOUSE_TABLE}_search_gin
+    ON {HOUSE_TABLE} USING gin (search_vector)
+    """,
+]
+
+# Trigram index serving both location substring filters and autocomplete
+POSTGRES_LOCATION_SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    CREATE INDEX IF NOT EXISTS {HOUSE_TABLE}_location_trgm
+    ON {HOUSE_TABLE} USING gin (location_normalized gin_trgm_ops)
+    """,
+]
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, location, description,
+        content='{HOUSE_TABLE}', content_rowid='id', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {HOUSE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {HOUSE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {HOUSE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+        VALUES ('delete', old.id, old.title, old.location, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+        VALUES (new.id, new.title, new.location, new.description);
+    END
+    """,
+    # Index rows that existed before the table was created
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def install_search_schema(using="default", **kwargs):
+    """post_migrate hook creating the vendor-specific search objects."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        schemas = [POSTGRES_SCHEMA, POSTGRES_LOCATION_SCHEMA]
+    elif connection.vendor == "sqlite":
+        if FTS_TABLE in connection.introspection.table_names():
+            return
+        schemas = [SQLITE_SCHEMA]
+    else:
+        return
+
+    for statements in schemas:
+        try:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        except DatabaseError:
+            logger.warning(
+                "Could not install search schema on %s; lookups stay unindexed.",
+                using,
+                exc_info=True,
+            )
+
+
+class HouseColumn(Expression):
+    """
+    A column of the house table that the model does not declare, qualified
+    with whatever alias the query compiling it gives that table, so the
+    filter still works once the queryset is nested in a subquery.
+    """
+
+    def __init__(self, column):
+        super().__init__(output_field=Field())
+        self.column = column
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.quote_name_unless_alias(compiler.query.base_table)
+        return f"{alias}.{connection.ops.quote_name(self.column)}", []
+
+
+def search_terms(text):
+    return [term.lower() for term in TOKEN_RE.findall(text)][:MAX_TERMS]
+
+
+def search_houses(queryset, text):
+    """
+    Filter ``queryset`` to houses matching every term of ``text``, each term
+    matching as a word prefix, and order them by relevance.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        vector = HouseColumn("search_vector")
+        tsquery = Func(
+            Value(" & ".join(f"{term}:*" for term in terms)),
+            template="to_tsquery('simple', %(expressions)s)",
+        )
+        match = Func(
+            vector,
+            tsquery,
+            template="%(expressions)s",
+            arg_joiner=" @@ ",
+            output_field=BooleanField(),
+        )
+        rank = Func(vector, tsquery, function="ts_rank", output_field=FloatField())
+    elif connection.vendor == "sqlite" and _has_fts_table(connection):
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        match = Q(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                (fts_query,),
+            )
+        )
+        # bm25() is lower-is-better; negate it so both backends sort descending
+        rank = Func(
+            Value(fts_query),
+            F("pk"),
+            template=(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %(expressions)s)"
+            ),
+            arg_joiner=" AND rowid = ",
+            output_field=FloatField(),
+        )
+    else:
+        match = Q()
+        for term in terms:
+            match &= (
+                Q(title__icontains=term)
+                | Q(description__icontains=term)
+                | Q(location__icontains=term)
+            )
+        return queryset.filter(match)
+
+    return (
+        queryset.filter(match).annotate(search_rank=rank).order_by("-search_rank", "id")
+    )
+
+
+def _has_fts_table(connection):
+    # SQLite only backs local development and tests, so introspect each time
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def filter_location_prefix(queryset, prefix):
+    """Filter to houses whose normalized location starts with ``prefix``."""
+    if connections[queryset.db].vendor == "postgresql":
+        # LIKE 'prefix%' is served by the trigram index
+        return queryset.filter(location_normalized__startswith=prefix)
+    # A half-open range stays on the plain B-tree index on other backends
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return queryset.filter(
+        location_normalized__gte=prefix, location_normalized__lt=upper
+    )
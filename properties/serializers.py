@@ -1,28 +1,104 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.utils import html
 
+from house_rent.perf import TimedSerializerMixin
 from interactions.models import Review
 
-from .models import Category, House
+from .models import Category, House, HouseImage, HouseRatingSummary, split_image_urls
 
 User = get_user_model()
 
 
+def rating_summary_for(house):
+    """Return the house's HouseRatingSummary, or None if it has no reviews yet."""
+    try:
+        return house.rating_summary
+    except HouseRatingSummary.DoesNotExist:
+        return None
+
+
+def review_count_for(house):
+    summary = rating_summary_for(house)
+    return summary.review_count if summary else 0
+
+
+def average_rating_for(house):
+    summary = rating_summary_for(house)
+    if summary is None or summary.average_rating is None:
+        return None
+    return round(summary.average_rating, 2)
+
+
 # Serializer for categories remains unchanged.
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "description"]
 
 
+class HouseImageListSerializer(serializers.ListSerializer):
+    """Also accepts the old comma separated string of URLs on writes."""
+
+    def get_value(self, dictionary):
+        if html.is_html_input(dictionary) and self.field_name in dictionary:
+            return dictionary.getlist(self.field_name)
+        return super().get_value(dictionary)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        if isinstance(data, list):
+            data = [
+                url
+                for item in data
+                for url in (split_image_urls(item) if isinstance(item, str) else [item])
+            ]
+        return super().to_internal_value(data)
+
+
+class HouseImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = HouseImage
+        fields = ["id", "url", "width", "height", "position", "is_primary"]
+        read_only_fields = ["id", "position"]
+        list_serializer_class = HouseImageListSerializer
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = {"url": data}
+        return super().to_internal_value(data)
+
+
+class HouseThumbnailSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HouseImage
+        fields = ["url", "width", "height"]
+
+
+def primary_image_for(house):
+    # The list queryset prefetches primary images into ``primary_images``
+    primary = getattr(house, "primary_images", None)
+    if primary is None:
+        primary = house.gallery.filter(is_primary=True)[:1]
+    return primary[0] if primary else None
+
+
 # -------------------------------
 # House List Serializer (Lightweight)
 # -------------------------------
-class HouseListSerializer(serializers.ModelSerializer):
+class HouseListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     owner_name = serializers.CharField(source="owner.username", read_only=True)
     review_count = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
+    # Only the primary image; the gallery is served by the detail endpoints
+    thumbnail = serializers.SerializerMethodField()
+    # Set by ?near= searches
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = House
@@ -31,24 +107,31 @@ class HouseListSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "location",
+            "latitude",
+            "longitude",
             "price",
-            "images",
+            "thumbnail",
             "approved",
             "categories",
             "owner_name",
             "review_count",
             "average_rating",
+            "distance_km",
         ]
 
     def get_review_count(self, obj):
-        return obj.reviews.count()
+        return review_count_for(obj)
 
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if not reviews:
-            return None
-        total = sum(review.rating for review in reviews)
-        return round(total / reviews.count(), 2)
+        return average_rating_for(obj)
+
+    def get_distance_km(self, obj):
+        distance = getattr(obj, "distance_km", None)
+        return None if distance is None else round(distance, 3)
+
+    def get_thumbnail(self, obj):
+        image = primary_image_for(obj)
+        return HouseThumbnailSerializer(image).data if image else None
 
 
 # -------------------------------
@@ -97,12 +180,16 @@ class ReviewDetailSerializer(serializers.ModelSerializer):
 # -------------------------------
 # House Detail Serializer (Full details)
 # -------------------------------
-class HouseDetailSerializer(serializers.ModelSerializer):
+class HouseDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     owner = OwnerDetailSerializer(read_only=True)
+    images = HouseImageSerializer(many=True, source="gallery", allow_empty=False)
+    images_url = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
-    reviews = ReviewDetailSerializer(many=True, read_only=True)
+    rating_histogram = serializers.SerializerMethodField()
+    reviews = serializers.SerializerMethodField()
+    reviews_url = serializers.SerializerMethodField()
     # reviews = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     # For writes, we use a list of category IDs.
     category_ids = serializers.PrimaryKeyRelatedField(
@@ -116,31 +203,94 @@ class HouseDetailSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "location",
+            "latitude",
+            "longitude",
             "price",
             "images",
+            "images_url",
             "approved",
             "categories",
             "category_ids",
             "owner",
             "review_count",
             "average_rating",
+            "rating_histogram",
             "created_at",
             "reviews",
+            "reviews_url",
         ]
 
+    # Only the latest reviews are embedded; the rest are paged via reviews_url
+    recent_reviews_limit = 5
+
+    @classmethod
+    def eager_loading(cls, queryset, prefix=""):
+        """
+        Load everything the representation reads for the houses in
+        ``queryset``, reached through ``prefix`` (e.g. "house__").
+        """
+        return queryset.select_related(
+            f"{prefix}owner", f"{prefix}rating_summary"
+        ).prefetch_related(
+            f"{prefix}categories",
+            f"{prefix}gallery",
+            # Review bodies are only rendered by the detail serializer, which
+            # embeds the latest few and links to the paginated reviews action
+            Prefetch(
+                f"{prefix}reviews",
+                queryset=Review.objects.select_related("reviewer").order_by(
+                    "-created_at", "-id"
+                )[: cls.recent_reviews_limit],
+                to_attr="recent_reviews",
+            ),
+        )
+
     def get_review_count(self, obj):
-        return obj.reviews.count()
+        return review_count_for(obj)
 
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if not reviews:
-            return None
-        total = sum(review.rating for review in reviews)
-        return round(total / reviews.count(), 2)
+        return average_rating_for(obj)
+
+    def get_rating_histogram(self, obj):
+        summary = rating_summary_for(obj) or HouseRatingSummary()
+        return summary.histogram
+
+    def get_reviews(self, obj):
+        recent = getattr(obj, "recent_reviews", None)
+        if recent is None:
+            recent = obj.reviews.select_related("reviewer").order_by(
+                "-created_at", "-id"
+            )[: self.recent_reviews_limit]
+        return ReviewDetailSerializer(recent, many=True, context=self.context).data
 
+    def get_reviews_url(self, obj):
+        return reverse(
+            "houses-reviews", kwargs={"pk": obj.pk}, request=self.context.get("request")
+        )
+
+    def get_images_url(self, obj):
+        return reverse(
+            "houses-images", kwargs={"pk": obj.pk}, request=self.context.get("request")
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        images = validated_data.pop("gallery")
+        instance = super().create(validated_data)
+        HouseImage.replace_gallery(instance, images)
+        # Save again so caches and ETags see the gallery
+        instance.save(update_fields=["updated_at"])
+        return instance
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        # Pop categories if present
+        # Pop categories and images if present
         categories = validated_data.pop("categories", None)
+        images = validated_data.pop("gallery", None)
+        if images is not None:
+            HouseImage.replace_gallery(instance, images)
+            # Drop any prefetched gallery so the response shows the new one
+            getattr(instance, "_prefetched_objects_cache", {}).pop("gallery", None)
         update_fields = []
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -149,3 +299,48 @@ class HouseDetailSerializer(serializers.ModelSerializer):
         if categories is not None:
             instance.categories.set(categories)
         return instance
+
+
+class IdListField(serializers.ListField):
+    """A list of ids, also accepted as a comma separated string (CSV cells)."""
+
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [part for part in data.split(",") if part.strip()]
+        return super().to_internal_value(data)
+
+
+class HouseImportSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk import. Validation does no queries: category ids are
+    checked against ``context["category_ids"]``, loaded once per import.
+    """
+
+    category_ids = IdListField(required=False)
+    images = HouseImageSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = House
+        fields = [
+            "title",
+            "description",
+            "location",
+            "latitude",
+            "longitude",
+            "price",
+            "category_ids",
+            "images",
+        ]
+
+    def validate_category_ids(self, value):
+        unknown = sorted(set(value) - self.context["category_ids"])
+        if unknown:
+            raise serializers.ValidationError(f"Unknown category ids: {unknown}.")
+        return list(dict.fromkeys(value))
+
+
+class HouseModerationSerializer(serializers.Serializer):
+    ids = IdListField(allow_empty=False, max_length=500)
+    action = serializers.ChoiceField(choices=["approve", "reject"])
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from interactions.models import Review
+
+from .cache import bump_generation
+from .models import Category, House, ResourceVersion
+
+# User fields embedded in house payloads (owner and reviewer details)
+EMBEDDED_USER_FIELDS = {"username", "first_name", "last_name", "email", "image"}
+
+
+@receiver(post_save, sender=House)
+@receiver(post_delete, sender=House)
+@receiver(m2m_changed, sender=House.categories.through)
+def house_changed(sender, action="post_", **kwargs):
+    # m2m_changed fires before and after each change; post_save and
+    # post_delete pass no action
+    if not action.startswith("post_"):
+        return
+    ResourceVersion.bump(ResourceVersion.HOUSES)
+    bump_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    ResourceVersion.bump(ResourceVersion.CATEGORIES)
+    bump_generation()
+
+
+@receiver(m2m_changed, sender=House.categories.through)
+def touch_houses_on_category_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        House.mark_updated([instance.pk])
+    elif pk_set:
+        House.mark_updated(pk_set)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_houses_on_user_change(
+    sender, instance, created, update_fields=None, raw=False, **kwargs
+):
+    # New users appear in no payload; logins only save last_login
+    if created or raw:
+        return
+    if update_fields is not None and not EMBEDDED_USER_FIELDS & set(update_fields):
+        return
+    house_ids = set(
+        House.objects.filter(owner=instance).values_list("pk", flat=True)
+    ) | set(Review.objects.filter(reviewer=instance).values_list("house_id", flat=True))
+    if house_ids:
+        House.mark_updated(house_ids)
+        ResourceVersion.bump(ResourceVersion.HOUSES)
+        bump_generation()
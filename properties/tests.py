@@ -1,3 +1,1617 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import (
+    APIRequestFactory,
+    APITestCase,
+    APITransactionTestCase,
+)
+
+from interactions.models import Booking, Favorite, RentRequest, Review
+from interactions.views import RentRequestViewSet
+
+from .geo import encode_geohash
+from .models import (
+    Category,
+    House,
+    HouseImage,
+    HouseRatingSummary,
+    ResourceVersion,
+)
+from .search import search_houses
+from .views import HouseViewSet
+
+User = get_user_model()
+
+
+class PropertiesAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = cls.create_user("owner")
+
+    def setUp(self):
+        # Rolled-back test data does not bump the response cache generation
+        cache.clear()
+
+    @staticmethod
+    def create_user(username):
+        return User.objects.create_user(
+            username=username,
+            email=f"{username}@example.com",
+            password="password123",
+        )
+
+    @classmethod
+    def create_house(cls, **fields):
+        """Create an approved house owned by ``cls.owner``, overriding ``fields``."""
+        defaults = {
+            "owner": cls.owner,
+            "title": "House",
+            "description": "A house",
+            "location": "Dhaka",
+            "price": Decimal("1000.00"),
+            "approved": True,
+        }
+        return House.objects.create(**{**defaults, **fields})
+
+
+class HouseListQueryBudgetTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.reviewers = [cls.create_user(f"reviewer{i}") for i in range(5)]
+        cls.category = Category.objects.create(name="Apartment")
+
+    def create_reviewed_house(self, reviews):
+        house = self.create_house()
+        house.categories.add(self.category)
+        for i in range(reviews):
+            Review.objects.create(
+                house=house, reviewer=self.reviewers[i % 5], rating=(i % 5) + 1
+            )
+        return house
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"page_size": 100})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_is_independent_of_review_volume(self):
+        for _ in range(3):
+            self.create_reviewed_house(reviews=1)
+        baseline, _ = self.count_list_queries()
+
+        for _ in range(20):
+            self.create_reviewed_house(reviews=10)
+        queries, response = self.count_list_queries()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(response.data["count"], 23)
+
+    def test_list_does_not_load_review_rows(self):
+        self.create_reviewed_house(reviews=3)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url)
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn(Review._meta.db_table, sql)
+
+    def test_list_reports_aggregated_review_stats(self):
+        house = self.create_reviewed_house(reviews=4)  # ratings 1, 2, 3, 4
+        self.create_reviewed_house(reviews=0)
+
+        _, response = self.count_list_queries()
+        results = {row["id"]: row for row in response.data["results"]}
+
+        self.assertEqual(results[house.id]["review_count"], 4)
+        self.assertEqual(results[house.id]["average_rating"], 2.5)
+        empty = next(row for row in results.values() if row["id"] != house.id)
+        self.assertEqual(empty["review_count"], 0)
+        self.assertIsNone(empty["average_rating"])
+
+    def test_detail_reports_aggregated_review_stats(self):
+        house = self.create_reviewed_house(reviews=3)  # ratings 1, 2, 3
+
+        response = self.client.get(f"{self.url}{house.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["review_count"], 3)
+        self.assertEqual(response.data["average_rating"], 2.0)
+
+
+class HouseRatingSummaryTests(PropertiesAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.reviewer = cls.create_user("reviewer")
+        cls.house = cls.create_house()
+
+    def summary(self):
+        return HouseRatingSummary.objects.get(house=self.house)
+
+    def test_review_writes_keep_summary_current(self):
+        first = Review.objects.create(
+            house=self.house, reviewer=self.reviewer, rating=5
+        )
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=2)
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (2, 7))
+        self.assertEqual(summary.average_rating, 3.5)
+        self.assertEqual(summary.histogram, {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1})
+
+        first.rating = 3
+        first.save()
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (2, 5))
+        self.assertEqual((summary.stars_3, summary.stars_5), (1, 0))
+
+        Review.objects.filter(house=self.house).delete()
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (0, 0))
+        self.assertIsNone(summary.average_rating)
+
+    def test_add_review_action_updates_summary(self):
+        self.client.force_authenticate(self.reviewer)
+        response = self.client.post(
+            f"/api/properties/houses/{self.house.id}/add_review/",
+            {"rating": 4, "comment": "Nice"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.summary().review_count, 1)
+
+        response = self.client.get(f"/api/properties/houses/{self.house.id}/")
+        self.assertEqual(response.data["average_rating"], 4.0)
+        self.assertEqual(response.data["rating_histogram"]["4"], 1)
+
+    def test_deleting_house_with_reviews(self):
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=5)
+        self.house.delete()
+        self.assertFalse(HouseRatingSummary.objects.exists())
+
+    def test_rebuild_command_recomputes_from_reviews(self):
+        Review.objects.bulk_create(
+            Review(house=self.house, reviewer=self.reviewer, rating=rating)
+            for rating in (1, 4, 4)
+        )
+        call_command("rebuild_rating_summaries", stdout=StringIO())
+        summary = self.summary()
+        self.assertEqual((summary.review_count, summary.rating_sum), (3, 9))
+        self.assertEqual(summary.average_rating, 3.0)
+        self.assertEqual((summary.stars_1, summary.stars_4), (1, 2))
+
+    def test_rebuild_command_invalidates_cached_houses(self):
+        Review.objects.bulk_create(
+            [Review(house=self.house, reviewer=self.reviewer, rating=5)]
+        )
+        version = ResourceVersion.current(ResourceVersion.HOUSES)
+        updated_at = House.objects.get(pk=self.house.pk).updated_at
+
+        call_command("rebuild_rating_summaries", stdout=StringIO())
+
+        self.assertNotEqual(ResourceVersion.current(ResourceVersion.HOUSES), version)
+        self.assertGreater(House.objects.get(pk=self.house.pk).updated_at, updated_at)
+
+
+class HouseReviewsPaginationTests(PropertiesAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.reviewer = cls.create_user("reviewer")
+        cls.house = cls.create_house()
+        cls.reviews = [
+            Review.objects.create(house=cls.house, reviewer=cls.reviewer, rating=5)
+            for _ in range(12)
+        ]
+
+    def test_detail_embeds_only_recent_reviews(self):
+        response = self.client.get(f"/api/properties/houses/{self.house.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["review_count"], 12)
+        self.assertEqual(
+            [review["id"] for review in response.data["reviews"]],
+            [review.id for review in reversed(self.reviews)][:5],
+        )
+        self.assertTrue(
+            response.data["reviews_url"].endswith(
+                f"/api/properties/houses/{self.house.id}/reviews/"
+            )
+        )
+
+    def test_reviews_action_is_cursor_paginated(self):
+        url = f"/api/properties/houses/{self.house.id}/reviews/?page_size=5"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 5)
+            seen.extend(review["id"] for review in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, [review.id for review in reversed(self.reviews)])
+
+
+class HouseSearchTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.villa = cls.create_house(
+            title="Beachside Villa",
+            description="Private pool and garden",
+            location="Cox's Bazar",
+        )
+        cls.apartment = cls.create_house(
+            title="Modern Apartment",
+            description="Close to the beach",
+            location="Chittagong",
+        )
+        cls.studio = cls.create_house(
+            title="Studio", description="Compact studio", location="Dhaka"
+        )
+
+    def search(self, term):
+        response = self.client.get(self.url, {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_matches_word_prefixes_across_fields(self):
+        self.assertEqual(self.search("apart"), [self.apartment.id])
+        self.assertEqual(self.search("chitt"), [self.apartment.id])
+        self.assertEqual(self.search("dhaka studio"), [self.studio.id])
+        self.assertEqual(self.search("villa dhaka"), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search("beach"), [self.villa.id, self.apartment.id])
+
+    def test_search_index_follows_updates(self):
+        self.studio.title = "Penthouse"
+        self.studio.save()
+        self.assertEqual(self.search("penthouse"), [self.studio.id])
+        self.assertEqual(self.search("studio"), [self.studio.id])  # description
+
+        self.studio.delete()
+        self.assertEqual(self.search("penthouse"), [])
+
+    def test_punctuation_only_search_is_ignored(self):
+        self.assertEqual(len(self.search("!!")), 3)
+
+    def test_search_works_as_a_subquery(self):
+        # Nested queries alias the house table, or have no house table at all
+        reviewer = self.create_user("reviewer")
+        for house in (self.villa, self.apartment, self.studio):
+            Review.objects.create(house=house, reviewer=reviewer, rating=4)
+        matches = search_houses(House.objects.all(), "beach")
+        reviews = Review.objects.filter(house__in=matches.values("pk"))
+        self.assertEqual(
+            {review.house_id for review in reviews}, {self.villa.id, self.apartment.id}
+        )
+        reviews = Review.objects.filter(Exists(matches.filter(pk=OuterRef("house_id"))))
+        self.assertEqual(
+            {review.house_id for review in reviews}, {self.villa.id, self.apartment.id}
+        )
+
+
+class LocationLookupTests(PropertiesAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for location, approved in [
+            ("Dhaka,  Gulshan", True),
+            ("dhaka, gulshan", True),
+            ("Dhaka, Banani", True),
+            ("Dhanmondi", True),
+            ("Dhaka, Uttara", False),
+            ("Sylhet", True),
+        ]:
+            cls.create_house(location=location, approved=approved)
+
+    def test_location_filter_is_case_and_whitespace_insensitive(self):
+        response = self.client.get(
+            "/api/properties/houses/", {"location": "DHAKA, gulshan"}
+        )
+        self.assertEqual(response.data["count"], 2)
+
+        response = self.client.get("/api/properties/houses/", {"location": "banani"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_autocomplete_groups_prefix_matches_by_count(self):
+        response = self.client.get(
+            "/api/properties/locations/autocomplete/", {"q": "  dh"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (row["location"].lower(), row["count"])
+                for row in response.data["results"]
+            ],
+            [("dhaka, gulshan", 2), ("dhaka, banani", 1), ("dhanmondi", 1)],
+        )
+
+    def test_autocomplete_limit_and_empty_query(self):
+        url = "/api/properties/locations/autocomplete/"
+        response = self.client.get(url, {"q": "dh", "limit": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(url, {"q": " "})
+        self.assertEqual(response.data["results"], [])
+
+    def test_normalize_command_invalidates_cached_houses(self):
+        House.objects.filter(location="Sylhet").update(location_normalized="")
+        before = House.objects.get(location="Sylhet")
+        version = ResourceVersion.current(ResourceVersion.HOUSES)
+
+        call_command("normalize_house_locations", stdout=StringIO())
+
+        house = House.objects.get(pk=before.pk)
+        self.assertEqual(house.location_normalized, "sylhet")
+        self.assertGreater(house.updated_at, before.updated_at)
+        self.assertNotEqual(ResourceVersion.current(ResourceVersion.HOUSES), version)
+
+
+class HouseCursorPaginationTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.houses = [
+            cls.create_house(
+                title=f"House {i}", location="Dhaka" if i % 2 else "Sylhet"
+            )
+            for i in range(7)
+        ]
+
+    def walk(self, url):
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            for query in ctx.captured_queries:
+                self.assertNotIn("COUNT(", query["sql"].upper())
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return seen
+
+    def test_cursor_mode_pages_through_every_house(self):
+        seen = self.walk(f"{self.url}?cursor=&page_size=3")
+        self.assertEqual(seen, [house.id for house in self.houses])
+
+    def test_cursor_mode_respects_filters(self):
+        seen = self.walk(f"{self.url}?cursor=&page_size=2&location=dhaka")
+        self.assertEqual(seen, [house.id for house in self.houses[1::2]])
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get(self.url, {"page_size": 3, "page": 2})
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [house.id for house in self.houses[3:6]],
+        )
+
+
+class HouseStreamingAllPageTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Apartment")
+        cls.houses = []
+        for i in range(5):
+            house = cls.create_house(title=f"House {i}")
+            house.categories.add(cls.category)
+            cls.houses.append(house)
+
+    def get_all(self, **params):
+        response = self.client.get(self.url, {"page": "all", **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_streams_every_row_in_chunks(self):
+        with mock.patch.object(HouseViewSet, "all_page_chunk_size", 2):
+            body = self.get_all()
+
+        self.assertEqual(body["count"], 5)
+        self.assertFalse(body["truncated"])
+        self.assertEqual(
+            [row["id"] for row in body["results"]], [h.id for h in self.houses]
+        )
+        self.assertEqual(body["results"][0]["categories"][0]["name"], "Apartment")
+
+    def test_row_cap_truncates(self):
+        with mock.patch.object(HouseViewSet, "all_page_max_rows", 3):
+            body = self.get_all(location="dhaka")
+
+        self.assertEqual(body["count"], 3)
+        self.assertTrue(body["truncated"])
+        self.assertEqual(len(body["results"]), 3)
+
+    def test_empty_result(self):
+        body = self.get_all(location="nowhere")
+        self.assertEqual(
+            body,
+            {
+                "next": None,
+                "previous": None,
+                "results": [],
+                "count": 0,
+                "truncated": False,
+            },
+        )
+
+
+class ResponseCacheTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.reviewer = cls.create_user("reviewer")
+        cls.category = Category.objects.create(name="Apartment")
+        cls.house = cls.create_house()
+
+    def assertCachedRead(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+        return second
+
+    def test_anonymous_reads_are_served_from_cache(self):
+        self.assertCachedRead(self.url)
+        self.assertCachedRead(f"{self.url}{self.house.id}/")
+        self.assertCachedRead("/api/properties/categories/")
+
+    def test_query_string_is_normalized_into_the_key(self):
+        self.client.get(self.url, {"location": "dhaka", "page_size": 5})
+        response = self.client.get(f"{self.url}?page_size=5&location=dhaka")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_owners_bypass_the_cache(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(self.url)
+        self.assertNotIn("X-Cache", response)
+
+    def test_writes_invalidate_cached_responses(self):
+        detail = f"{self.url}{self.house.id}/"
+        categories = "/api/properties/categories/"
+        self.assertCachedRead(detail)
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=4)
+        response = self.assertCachedRead(detail)
+        self.assertEqual(response.data["review_count"], 1)
+
+        self.house.categories.add(self.category)
+        response = self.assertCachedRead(detail)
+        self.assertEqual(len(response.data["categories"]), 1)
+
+        self.category.name = "Flat"
+        self.category.save()
+        response = self.assertCachedRead(categories)
+        self.assertEqual(response.data["results"][0]["name"], "Flat")
+
+        self.assertCachedRead(self.url)
+        self.house.approved = False
+        self.house.save()
+        self.assertEqual(self.client.get(self.url).data["count"], 0)
+
+    def test_category_changes_bump_the_version_once(self):
+        def version():
+            return ResourceVersion.current(ResourceVersion.HOUSES)[
+                ResourceVersion.HOUSES
+            ][0]
+
+        before = version()
+        self.house.categories.add(self.category)
+        self.assertEqual(version(), before + 1)
+        self.house.categories.clear()
+        self.assertEqual(version(), before + 2)
+
+    def test_profile_changes_invalidate_cached_responses(self):
+        detail = f"{self.url}{self.house.id}/"
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=4)
+        self.assertCachedRead(self.url)
+        self.assertCachedRead(detail)
+        self.owner.username = "landlord"
+        self.owner.save()
+        response = self.assertCachedRead(self.url)
+        self.assertEqual(response.data["results"][0]["owner_name"], "landlord")
+
+        self.reviewer.email = "critic@example.com"
+        self.reviewer.save()
+        response = self.assertCachedRead(detail)
+        self.assertEqual(
+            response.data["reviews"][0]["reviewer_email"], "critic@example.com"
+        )
+
+        # A login only saves last_login
+        self.owner.save(update_fields=["last_login"])
+        self.assertEqual(self.client.get(detail)["X-Cache"], "HIT")
+
+
+class ConditionalGetTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.reviewer = cls.create_user("reviewer")
+        cls.category = Category.objects.create(name="Apartment")
+        cls.house = cls.create_house()
+
+    def assertNotModified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again.content, b"")
+        return response["ETag"]
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_reads_answer_if_none_match_with_304(self):
+        self.assertNotModified(self.url)
+        self.assertNotModified(f"{self.url}{self.house.id}/")
+        self.assertNotModified(f"{self.url}{self.house.id}/reviews/")
+        self.assertNotModified("/api/properties/categories/")
+
+    def test_if_modified_since_is_honoured(self):
+        response = self.client.get(self.url)
+        again = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_responses_still_revalidate_without_queries(self):
+        etag = self.assertNotModified(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_version_is_a_single_lookup(self):
+        self.client.force_authenticate(self.owner)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertFalse(any("MAX(" in q["sql"] for q in ctx.captured_queries))
+
+    def test_writes_change_the_etag(self):
+        detail = f"{self.url}{self.house.id}/"
+        reviews = f"{detail}reviews/"
+        etags = {
+            url: self.assertNotModified(url) for url in (self.url, detail, reviews)
+        }
+
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=4)
+        for url, etag in etags.items():
+            self.assertModified(url, etag)
+
+        etags = {url: self.assertNotModified(url) for url in (self.url, detail)}
+        self.house.categories.add(self.category)
+        for url, etag in etags.items():
+            self.assertModified(url, etag)
+
+        etags = {url: self.assertNotModified(url) for url in (self.url, detail)}
+        categories = self.assertNotModified("/api/properties/categories/")
+        self.category.name = "Flat"
+        self.category.save()
+        for url, etag in etags.items():
+            self.assertModified(url, etag)
+        self.assertModified("/api/properties/categories/", categories)
+
+        etag = self.assertNotModified(detail)
+        self.house.price = Decimal("1200.00")
+        self.house.save()
+        self.assertModified(detail, etag)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_profile_changes_change_the_etag(self):
+        # Owner and reviewer details are embedded in the house payloads
+        Review.objects.create(house=self.house, reviewer=self.reviewer, rating=4)
+        detail = f"{self.url}{self.house.id}/"
+        etags = {url: self.assertNotModified(url) for url in (self.url, detail)}
+        self.owner.username = "landlord"
+        self.owner.save()
+        for url, etag in etags.items():
+            self.assertModified(url, etag)
+        response = self.client.get(detail)
+        self.assertEqual(response.data["owner"]["owner_username"], "landlord")
+
+        etag = self.assertNotModified(detail)
+        self.reviewer.image = "https://example.com/reviewer.jpg"
+        self.reviewer.save()
+        self.assertModified(detail, etag)
+
+        etag = self.assertNotModified(detail)
+        self.owner.save(update_fields=["last_login"])
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_house_is_still_404(self):
+        response = self.client.get(f"{self.url}999999/", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_house_id_is_404(self):
+        for url in (
+            f"{self.url}abc/",
+            f"{self.url}abc/reviews/",
+            f"{self.url}abc/images/",
+            "/api/properties/async/houses/abc/",
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class HouseImageTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Apartment")
+
+    def payload(self, images):
+        return {
+            "title": "House",
+            "description": "A house",
+            "location": "Dhaka",
+            "price": "1000.00",
+            "category_ids": [self.category.id],
+            "images": images,
+        }
+
+    def test_create_accepts_comma_separated_urls(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            self.url,
+            self.payload("https://example.com/a.jpg, https://example.com/b.jpg"),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(image["url"], image["is_primary"]) for image in response.data["images"]],
+            [("https://example.com/a.jpg", True), ("https://example.com/b.jpg", False)],
+        )
+
+    def test_update_replaces_gallery_and_honours_primary_flag(self):
+        house = self.create_house()
+        HouseImage.replace_gallery(house, [{"url": "https://example.com/old.jpg"}])
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f"{self.url}{house.id}/",
+            {
+                "images": [
+                    "https://example.com/a.jpg",
+                    {"url": "https://example.com/b.jpg", "is_primary": True},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(house.gallery.values_list("url", "position", "is_primary")),
+            [
+                ("https://example.com/a.jpg", 0, False),
+                ("https://example.com/b.jpg", 1, True),
+            ],
+        )
+        self.assertEqual(len(response.data["images"]), 2)
+
+    def test_empty_gallery_is_rejected(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(self.url, self.payload(""), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("images", response.data)
+
+    def test_list_ships_only_the_thumbnail(self):
+        for _ in range(3):
+            house = self.create_house()
+            HouseImage.replace_gallery(
+                house,
+                [{"url": f"https://example.com/{i}.jpg"} for i in range(40)],
+            )
+        self.create_house()
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        results = response.data["results"]
+        self.assertNotIn("images", results[0])
+        self.assertEqual(results[0]["thumbnail"]["url"], "https://example.com/0.jpg")
+        self.assertIsNone(results[3]["thumbnail"])
+
+    def test_gallery_is_paged_by_the_images_action(self):
+        house = self.create_house()
+        HouseImage.replace_gallery(
+            house, [{"url": f"https://example.com/{i}.jpg"} for i in range(12)]
+        )
+        detail = self.client.get(f"{self.url}{house.id}/")
+        self.assertEqual(len(detail.data["images"]), 12)
+
+        response = self.client.get(detail.data["images_url"], {"page": 2})
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual(
+            [image["position"] for image in response.data["results"]], [10, 11]
+        )
+
+        response = self.client.get(detail.data["images_url"], {"page": "all"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [image["position"] for image in response.data], list(range(12))
+        )
+
+    def test_split_command_backfills_legacy_strings(self):
+        legacy = self.create_house(
+            images="https://example.com/a.jpg,,https://example.com/b.jpg "
+        )
+        migrated = self.create_house(images="https://example.com/c.jpg")
+        HouseImage.replace_gallery(migrated, [{"url": "https://example.com/new.jpg"}])
+        self.create_house()
+
+        call_command("split_house_images", stdout=StringIO())
+        call_command("split_house_images", stdout=StringIO())
+
+        self.assertEqual(
+            list(legacy.gallery.values_list("url", "is_primary")),
+            [("https://example.com/a.jpg", True), ("https://example.com/b.jpg", False)],
+        )
+        self.assertEqual(migrated.gallery.count(), 1)
+        self.assertEqual(HouseImage.objects.count(), 3)
+
+
+class QueryPlanTests(PropertiesAPITestCase):
+    """Fail if the hot list queries stop using an index on a seeded dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tenant = cls.create_user("tenant")
+        cls.categories = Category.objects.bulk_create(
+            Category(name=f"Category {i}") for i in range(20)
+        )
+        owners = User.objects.bulk_create(
+            User(username=f"seed{i}", email=f"seed{i}@example.com") for i in range(50)
+        )
+        houses = House.objects.bulk_create(
+            House(
+                owner=owners[i % len(owners)],
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka",
+                price=Decimal(500 + i % 5000),
+                approved=i % 10 == 0,
+            )
+            for i in range(5000)
+        )
+        House.categories.through.objects.bulk_create(
+            House.categories.through(house=house, category=cls.categories[i % 20])
+            for i, house in enumerate(houses)
+        )
+        Review.objects.bulk_create(
+            Review(house=houses[i % 500], reviewer=owners[i % 50], rating=i % 5 + 1)
+            for i in range(5000)
+        )
+        RentRequest.objects.bulk_create(
+            RentRequest(house=house, tenant=owners[i % 50])
+            for i, house in enumerate(houses)
+        )
+        Favorite.objects.bulk_create(
+            Favorite(house=houses[i], user=owners[i % 50]) for i in range(0, 5000, 7)
+        )
+        cls.house = houses[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def list_queryset(self, user=None, **params):
+        request = Request(APIRequestFactory().get("/api/properties/houses/", params))
+        request.user = user or AnonymousUser()
+        view = HouseViewSet(request=request, action="list", kwargs={})
+        view.format_kwarg = None
+        return view.filter_queryset(view.get_queryset())[:10]
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Make any remaining sequential scan stand out in the plan
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}", params)
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            rows = cursor.fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+
+    def assertIndexed(self, queryset, *tables):
+        plan = self.query_plan(queryset)
+        for table in tables:
+            if connection.vendor == "postgresql":
+                self.assertNotIn(f"Seq Scan on {table}", plan)
+            else:
+                self.assertNotRegex(plan, rf"SCAN {table}(?! USING)")
+
+    def test_public_list(self):
+        self.assertIndexed(self.list_queryset(), "properties_house")
+
+    def test_public_list_price_range(self):
+        queryset = self.list_queryset(min_price=600, max_price=700)
+        self.assertIndexed(queryset, "properties_house")
+
+    def test_category_filter(self):
+        queryset = self.list_queryset(category=self.categories[3].id)
+        self.assertIndexed(queryset, "properties_house", "properties_house_categories")
+
+    def test_ordered_public_list(self):
+        for ordering in ("-price", "created_at"):
+            with self.subTest(ordering=ordering):
+                queryset = self.list_queryset(ordering=ordering)
+                self.assertIndexed(queryset, "properties_house")
+
+    def test_near_search(self):
+        queryset = self.list_queryset(near="23.78,90.41", radius_km=5)
+        self.assertIndexed(queryset, "properties_house")
+
+    def test_owner_list(self):
+        # approved OR owner cannot use one index; both backends walk the
+        # primary key in list order and stop once the page is full
+        plan = self.query_plan(self.list_queryset(self.owner))
+        self.assertNotIn("Seq Scan on properties_house", plan)
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    def test_recent_reviews(self):
+        queryset = Review.objects.filter(house=self.house).order_by(
+            "-created_at", "-id"
+        )[:5]
+        self.assertIndexed(queryset, "interactions_review")
+
+    def test_booking_overlap_probe(self):
+        bookings = Booking.objects.filter(house=self.house).overlapping(
+            self.house.created_at, self.house.created_at + timedelta(days=7)
+        )
+        self.assertIndexed(bookings, "interactions_booking")
+
+    def test_moderation_queue(self):
+        queryset = House.objects.filter(approved=False).order_by("created_at", "id")
+        plan = self.query_plan(queryset[:20])
+        self.assertIndexed(queryset[:20], "properties_house")
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_rent_requests_and_favorites(self):
+        request = Request(APIRequestFactory().get("/api/interactions/rent-requests/"))
+        request.user = self.tenant
+        view = RentRequestViewSet(request=request, kwargs={})
+        self.assertIndexed(
+            view.get_queryset(), "interactions_rentrequest", "properties_house"
+        )
+        duplicate = RentRequest.objects.filter(house=self.house, tenant=self.tenant)
+        self.assertIndexed(duplicate, "interactions_rentrequest")
+        favorites = Favorite.objects.filter(user=self.tenant, house=self.house)
+        self.assertIndexed(favorites, "interactions_favorite")
+
+
+class HouseCategoryFilterTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.flat, cls.villa, cls.studio = Category.objects.bulk_create(
+            Category(name=name) for name in ("Flat", "Villa", "Studio")
+        )
+        cls.houses = {}
+        for title, categories in (
+            ("flat", [cls.flat]),
+            ("flat villa", [cls.flat, cls.villa]),
+            ("all three", [cls.flat, cls.villa, cls.studio]),
+            ("none", []),
+        ):
+            house = cls.create_house(title=title)
+            house.categories.set(categories)
+            cls.houses[title] = house
+
+    def titles(self, query):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"{self.url}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("DISTINCT", sql)
+        return sorted(row["title"] for row in response.data["results"])
+
+    def test_single_category(self):
+        self.assertEqual(
+            self.titles(f"category={self.villa.id}"), ["all three", "flat villa"]
+        )
+
+    def test_any_match_does_not_duplicate_houses(self):
+        ids = f"{self.flat.id},{self.villa.id},{self.studio.id}"
+        self.assertEqual(
+            self.titles(f"category={ids}"), ["all three", "flat", "flat villa"]
+        )
+
+    def test_all_match(self):
+        ids = f"{self.flat.id},{self.villa.id}"
+        self.assertEqual(
+            self.titles(f"category={ids}&category_match=all"),
+            ["all three", "flat villa"],
+        )
+
+    def test_invalid_ids_are_ignored(self):
+        self.assertEqual(len(self.titles("category=abc,")), 4)
+        self.assertEqual(self.titles(f"category=x,{self.studio.id}"), ["all three"])
+
+
+class HouseAvailabilityTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.free, cls.busy = (
+            cls.create_house(title=title) for title in ("free", "busy")
+        )
+        # Years of history plus one booking in March
+        day = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+        Booking.objects.bulk_create(
+            Booking(
+                house=cls.busy,
+                start=day + timedelta(days=30 * i),
+                end=day + timedelta(days=30 * i + 20),
+            )
+            for i in range(60)
+        )
+        Booking.objects.create(
+            house=cls.busy,
+            start=datetime(2030, 3, 1, tzinfo=dt_timezone.utc),
+            end=datetime(2030, 3, 31, tzinfo=dt_timezone.utc),
+        )
+
+    def titles(self, query):
+        response = self.client.get(f"{self.url}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row["title"] for row in response.data["results"])
+
+    def test_overlapping_bookings_hide_the_house(self):
+        query = "available_from=2030-03-20&available_to=2030-04-10"
+        self.assertEqual(self.titles(query), ["free"])
+        self.assertEqual(self.titles("available_from=2030-03-15"), ["free"])
+
+    def test_periods_are_half_open(self):
+        query = "available_from=2030-03-31&available_to=2030-04-10"
+        self.assertEqual(self.titles(query), ["busy", "free"])
+        query = "available_from=2030-02-01T00:00:00Z&available_to=2030-03-01T00:00:00Z"
+        self.assertEqual(self.titles(query), ["busy", "free"])
+
+    def test_invalid_periods_are_ignored(self):
+        self.assertEqual(len(self.titles("available_from=soon")), 2)
+        query = "available_from=2030-04-10&available_to=2030-04-01"
+        self.assertEqual(len(self.titles(query)), 2)
+
+    def test_writes_invalidate_cached_lists(self):
+        query = "available_from=2031-01-01&available_to=2031-01-10"
+        self.assertEqual(self.titles(query), ["busy", "free"])
+        Booking.objects.create(
+            house=self.free,
+            start=datetime(2031, 1, 5, tzinfo=dt_timezone.utc),
+            end=datetime(2031, 1, 6, tzinfo=dt_timezone.utc),
+        )
+        self.assertEqual(self.titles(query), ["busy"])
+
+
+class GeoSearchTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for title, latitude, longitude in (
+            ("dhaka", 23.7808, 90.4093),
+            ("gulshan", 23.7925, 90.4078),
+            ("chittagong", 22.3569, 91.7832),
+            ("suva east", -17.7, 179.95),
+            ("suva west", -17.7, -179.95),
+            ("nowhere", None, None),
+        ):
+            cls.create_house(
+                title=title,
+                location="Somewhere",
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+    def results(self, query):
+        response = self.client.get(f"{self.url}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+    def titles(self, query):
+        return [row["title"] for row in self.results(query)]
+
+    def test_geohash_follows_coordinates(self):
+        self.assertEqual(encode_geohash(42.6, -5.6, 5), "ezs42")
+        house = House.objects.get(title="dhaka")
+        self.assertTrue(house.geohash.startswith("wh0r"))
+        house.latitude = None
+        house.save(update_fields=["latitude"])
+        house.refresh_from_db()
+        self.assertEqual(house.geohash, "")
+
+    def test_near_sorts_by_distance(self):
+        rows = self.results("near=23.7930,90.4070&radius_km=5")
+        self.assertEqual([row["title"] for row in rows], ["gulshan", "dhaka"])
+        self.assertLess(rows[0]["distance_km"], 0.2)
+        self.assertAlmostEqual(rows[1]["distance_km"], 1.36, places=1)
+
+        titles = self.titles("near=23.7930,90.4070&radius_km=300")
+        self.assertEqual(titles, ["gulshan", "dhaka", "chittagong"])
+
+    def test_near_crosses_the_antimeridian(self):
+        self.assertEqual(
+            self.titles("near=-17.7,-179.99&radius_km=20"), ["suva west", "suva east"]
+        )
+
+    def test_bbox(self):
+        self.assertEqual(
+            sorted(self.titles("bbox=90.3,23.7,90.5,23.8")), ["dhaka", "gulshan"]
+        )
+        self.assertEqual(
+            sorted(self.titles("bbox=179.9,-18,-179.9,-17")),
+            ["suva east", "suva west"],
+        )
+        self.assertEqual(
+            sorted(self.titles("bbox=-180,-90,180,90")),
+            ["chittagong", "dhaka", "gulshan", "suva east", "suva west"],
+        )
+
+    def test_invalid_parameters_are_ignored(self):
+        self.assertEqual(len(self.titles("near=91,10")), 6)
+        self.assertEqual(len(self.titles("near=23.7,nan")), 6)
+        self.assertEqual(len(self.titles("near=23.7,90.4&radius_km=-1")), 6)
+        self.assertEqual(len(self.titles("bbox=1,2,3")), 6)
+
+
+class HouseOrderingAndFacetTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        reviewer = cls.create_user("reviewer")
+        cls.flat, cls.villa = Category.objects.bulk_create(
+            Category(name=name) for name in ("Flat", "Villa")
+        )
+        for title, price, rating, categories in (
+            ("a", "400.00", 5, [cls.flat]),
+            ("b", "1200.00", 2, [cls.flat, cls.villa]),
+            ("c", "1200.00", None, [cls.villa]),
+            ("d", "20000.00", 4, []),
+            ("e", "700.00", None, [cls.flat]),
+        ):
+            house = cls.create_house(title=title, price=Decimal(price))
+            house.categories.set(categories)
+            if rating:
+                Review.objects.create(house=house, reviewer=reviewer, rating=rating)
+        cls.create_house(
+            title="hidden",
+            description="Not approved",
+            price=Decimal("100.00"),
+            approved=False,
+        )
+
+    def titles(self, query):
+        response = self.client.get(f"{self.url}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["title"] for row in response.data["results"]]
+
+    def test_ordering_by_price_breaks_ties_by_id(self):
+        self.assertEqual(self.titles("ordering=price"), ["a", "e", "b", "c", "d"])
+        self.assertEqual(self.titles("ordering=-price"), ["d", "c", "b", "e", "a"])
+
+    def test_unrated_houses_sort_last(self):
+        self.assertEqual(self.titles("ordering=-rating"), ["a", "d", "b", "e", "c"])
+        self.assertEqual(self.titles("ordering=rating"), ["b", "d", "a", "c", "e"])
+
+    def test_unknown_ordering_is_ignored(self):
+        self.assertEqual(self.titles("ordering=owner"), ["a", "b", "c", "d", "e"])
+
+    def test_cursor_mode_follows_ordering(self):
+        url = f"{self.url}?cursor=&ordering=-price&page_size=2"
+        titles = []
+        while url:
+            response = self.client.get(url)
+            titles += [row["title"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(titles, ["d", "c", "b", "e", "a"])
+
+    def test_facets_use_one_grouped_query_each(self):
+        with self.assertNumQueries(4):  # version lookup + three facets
+            response = self.client.get(f"{self.url}facets/?min_price=500")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(
+            [(row["name"], row["count"]) for row in response.data["categories"]],
+            [("Flat", 2), ("Villa", 2)],
+        )
+        self.assertEqual(
+            [band["count"] for band in response.data["price"]], [0, 1, 2, 0, 0, 1]
+        )
+        self.assertEqual(
+            response.data["price"][-1], {"min": 10000, "max": None, "count": 1}
+        )
+        self.assertEqual(
+            [band["count"] for band in response.data["rating"]], [0, 0, 1, 0, 1, 2]
+        )
+        self.assertEqual(response.data["rating"][-1]["min"], None)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(f"{self.url}facets/?min_price=500")
+        self.assertEqual(cached.data, response.data)
+
+    def test_facets_combine_search_with_other_filters(self):
+        response = self.client.get(f"{self.url}facets/?search=b&min_price=1000")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            [(row["name"], row["count"]) for row in response.data["categories"]],
+            [("Flat", 1), ("Villa", 1)],
+        )
+        response = self.client.get(
+            f"{self.url}facets/?search=c&category={self.villa.pk}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            [band["count"] for band in response.data["price"]], [0, 0, 1, 0, 0, 0]
+        )
+
+
+class HouseBulkImportExportTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = cls.create_user("other")
+        cls.flat, cls.villa = Category.objects.bulk_create(
+            Category(name=name) for name in ("Flat", "Villa")
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.owner)
+
+    def row(self, i, **overrides):
+        return {
+            "title": f"House {i}",
+            "description": "Imported",
+            "location": f"  Dhaka   {i}",
+            "price": "1000.00",
+            "category_ids": [self.flat.id, self.villa.id],
+            "images": [
+                f"https://example.com/{i}a.jpg",
+                f"https://example.com/{i}b.jpg",
+            ],
+            **overrides,
+        }
+
+    def post(self, body, content_type):
+        return self.client.generic(
+            "POST", f"{self.url}bulk/", body, content_type=content_type
+        )
+
+    def test_jsonl_import_uses_a_fixed_number_of_queries(self):
+        body = "\n".join(json.dumps(self.row(i)) for i in range(1200))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post(body, "application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1200)
+        # A handful of INSERTs per batch (SQLite splits them further by its
+        # bound parameter limit), never one per row
+        self.assertLess(len(ctx.captured_queries), 1200 // 20)
+
+        house = House.objects.get(pk=response.data["ids"][7])
+        self.assertEqual(house.owner, self.owner)
+        self.assertFalse(house.approved)
+        self.assertEqual(house.location_normalized, "dhaka 7")
+        self.assertEqual(house.categories.count(), 2)
+        self.assertEqual(
+            list(house.gallery.values_list("position", "is_primary")),
+            [(0, True), (1, False)],
+        )
+
+    def test_csv_import(self):
+        body = (
+            "﻿title,description,location,price,latitude,longitude,category_ids,images\r\n"
+            f'Flat,Nice,Dhaka,900,23.78,90.4,"{self.flat.id}",'
+            '"https://example.com/a.jpg,https://example.com/b.jpg"\r\n'
+            "Plot,Big,Khulna,500,,,,https://example.com/c.jpg\r\n"
+        )
+        response = self.post(body, "text/csv")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        flat, plot = House.objects.filter(pk__in=response.data["ids"]).order_by("id")
+        self.assertEqual(list(flat.categories.all()), [self.flat])
+        self.assertEqual(flat.gallery.count(), 2)
+        self.assertNotEqual(flat.geohash, "")
+        self.assertIsNone(plot.latitude)
+        self.assertEqual(plot.categories.count(), 0)
+
+    def test_invalid_rows_abort_the_whole_import(self):
+        rows = [
+            self.row(0),
+            self.row(1, price="cheap"),
+            self.row(2, category_ids=[999]),
+            self.row(3, images=[]),
+        ]
+        response = self.client.post(f"{self.url}bulk/", rows, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 4])
+        self.assertIn("category_ids", response.data["errors"][1]["errors"])
+        self.assertFalse(House.objects.exists())
+
+    def test_malformed_jsonl_is_a_parse_error(self):
+        response = self.post('{"title": "ok"}\n{oops', "application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Line 2", response.data["detail"])
+
+    def test_import_invalidates_cached_lists(self):
+        self.client.force_authenticate(None)
+        self.client.get(self.url)
+        self.client.force_authenticate(self.owner)
+        ids = self.post(json.dumps(self.row(0)), "application/x-ndjson").data["ids"]
+        House.objects.filter(pk__in=ids).update(approved=True)
+        ResourceVersion.bump(ResourceVersion.HOUSES)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).data["count"], 1)
+
+    def test_export_streams_only_own_houses(self):
+        ids = self.post(
+            "\n".join(json.dumps(self.row(i)) for i in range(3)), "application/x-ndjson"
+        ).data["ids"]
+        self.create_house(
+            owner=self.other,
+            title="Other",
+            description="Not mine",
+            price=Decimal("1.00"),
+            approved=False,
+        )
+
+        response = self.client.get(f"{self.url}export/")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["id"] for row in rows], ids)
+        self.assertEqual(rows[0]["category_ids"], [self.flat.id, self.villa.id])
+
+        response = self.client.get(f"{self.url}export/", {"export_format": "csv"})
+        body = b"".join(response.streaming_content).decode()
+        # The CSV export can be imported back as is
+        House.objects.all().delete()
+        response = self.post(body, "text/csv")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        house = House.objects.get(title="House 2")
+        self.assertEqual(house.gallery.first().url, "https://example.com/2a.jpg")
+
+    def test_export_rejects_unknown_formats(self):
+        response = self.client.get(f"{self.url}export/", {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class HouseModerationTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = cls.create_user("admin")
+        cls.admin.role = "admin"
+        cls.admin.save()
+        start = timezone.now() - timedelta(days=10)
+        cls.houses = House.objects.bulk_create(
+            House(
+                owner=cls.owner,
+                title=f"House {i}",
+                description="A house",
+                location="Dhaka",
+                price=Decimal("1000.00"),
+                approved=i == 0,
+            )
+            for i in range(5)
+        )
+        # Submission order differs from insertion order
+        for i, house in enumerate(cls.houses):
+            house.created_at = start + timedelta(days=(i * 3) % 5)
+            House.objects.filter(pk=house.pk).update(created_at=house.created_at)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.admin)
+
+    def moderate(self, ids, action):
+        return self.client.post(
+            f"{self.url}moderate/", {"ids": ids, "action": action}, format="json"
+        )
+
+    def test_batch_approve_is_one_update(self):
+        pks = [house.pk for house in self.houses]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.moderate(pks + [999999], "approve")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The already approved house is left untouched
+        self.assertEqual(response.data["updated"], 4)
+        updates = [
+            query
+            for query in ctx.captured_queries
+            if query["sql"].startswith('UPDATE "properties_house"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(House.objects.filter(approved=True).count(), 5)
+
+        response = self.moderate(pks[:2], "reject")
+        self.assertEqual(response.data["updated"], 2)
+        self.assertEqual(House.objects.filter(approved=False).count(), 2)
+
+    def test_moderation_invalidates_public_reads(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).data["count"], 1)
+        house = self.houses[1]
+        response = self.client.get(f"{self.url}{house.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.admin)
+        before = House.objects.get(pk=house.pk).updated_at
+        self.moderate([house.pk], "approve")
+        self.assertGreater(House.objects.get(pk=house.pk).updated_at, before)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).data["count"], 2)
+        response = self.client.get(f"{self.url}{house.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_requests(self):
+        self.assertEqual(
+            self.moderate([], "approve").status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self.moderate([1], "delete").status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.client.force_authenticate(self.owner)
+        response = self.moderate([self.houses[1].pk], "approve")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(House.objects.get(pk=self.houses[1].pk).approved)
+
+    def test_queue_lists_pending_houses_oldest_first(self):
+        url = f"{self.url}moderation_queue/"
+        pending = sorted(
+            (house for house in self.houses if not house.approved),
+            key=lambda house: house.created_at,
+        )
+        response = self.client.get(url, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        ids = [house["id"] for house in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        ids += [house["id"] for house in response.data["results"]]
+        self.assertEqual(ids, [house.pk for house in pending])
+        self.assertIsNone(response.data["next"])
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class HouseWriteQueryTests(PropertiesAPITestCase):
+    url = "/api/properties/houses/"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = cls.create_user("admin")
+        cls.admin.role = "admin"
+        cls.admin.save()
+        cls.tenant = cls.create_user("tenant")
+        cls.category = Category.objects.create(name="Flat")
+
+    def setUp(self):
+        super().setUp()
+        self.house = self.create_house()
+        self.house.categories.add(self.category)
+        HouseImage.replace_gallery(self.house, [{"url": "https://example.com/a.jpg"}])
+        Review.objects.create(house=self.house, reviewer=self.tenant, rating=4)
+        self.detail = f"{self.url}{self.house.pk}/"
+
+    def request(self, method, url, user, queries, data=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertEqual(len(ctx.captured_queries), queries)
+        self.queries = [query["sql"] for query in ctx.captured_queries]
+        return response
+
+    def test_status_changes_load_three_columns_once(self):
+        # SELECT id, owner_id, approved; UPDATE; version bump
+        for action, user in (
+            ("approve", self.admin),
+            ("reject", self.admin),
+            ("submit_for_approval", self.owner),
+        ):
+            with self.subTest(action=action):
+                response = self.request(
+                    "post", f"{self.detail}{action}/", user, queries=3
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertNotIn('"properties_house"."title"', self.queries[0])
+
+    def test_add_review_loads_the_house_once(self):
+        # SELECT house; INSERT review; updated_at; version bump; summary
+        # UPDATE in its savepoint
+        response = self.request(
+            "post",
+            f"{self.detail}add_review/",
+            self.admin,
+            queries=7,
+            data={"rating": 5, "comment": "Great"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.house.rating_summary.review_count, 2)
+
+    def test_update_loads_the_house_once(self):
+        # SELECT house; UPDATE and version bump in a savepoint; the
+        # response then reads the gallery, categories and recent reviews
+        response = self.request(
+            "patch", self.detail, self.owner, queries=8, data={"title": "New"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "New")
+        house_selects = [
+            sql
+            for sql in self.queries
+            if sql.startswith("SELECT") and 'FROM "properties_house"' in sql
+        ]
+        self.assertEqual(len(house_selects), 1)
+
+        response = self.request("put", self.detail, self.tenant, queries=1, data={})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_destroy_does_not_scale_with_reviews(self):
+        Review.objects.bulk_create(
+            Review(house=self.house, reviewer=self.admin, rating=3) for _ in range(5)
+        )
+        Booking.objects.create(
+            house=self.house,
+            start=timezone.now(),
+            end=timezone.now() + timedelta(days=3),
+        )
+        # SELECT house; collect rent requests, bookings, reviews; 7 DELETEs
+        # and one version bump for the house itself
+        response = self.request("delete", self.detail, self.owner, queries=12)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(House.objects.filter(pk=self.house.pk).exists())
+        self.assertFalse(HouseRatingSummary.objects.exists())
+
+        self.assertEqual(
+            self.client.delete(self.detail).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+
+class LoadSeedingTests(PropertiesAPITestCase):
+    def test_seed_load_data_and_bench_api(self):
+        call_command(
+            "seed_load_data",
+            houses=30,
+            reviews_per_house=3,
+            users=10,
+            favorites_per_user=2,
+            batch_size=12,
+            stdout=StringIO(),
+        )
+        self.assertEqual(House.objects.count(), 30)
+        self.assertEqual(HouseImage.objects.filter(is_primary=True).count(), 30)
+        self.assertEqual(Review.objects.count(), 90)
+        self.assertEqual(RentRequest.objects.count(), 30)
+        self.assertFalse(
+            RentRequest.objects.exclude(
+                status__in=[value for value, _ in RentRequest.STATUS_CHOICES]
+            ).exists()
+        )
+        self.assertEqual(Favorite.objects.count(), 20)
+        self.assertEqual(HouseRatingSummary.objects.count(), 30)
+        self.assertFalse(House.objects.filter(geohash="").exists())
+        with self.assertRaises(CommandError):
+            call_command("seed_load_data", houses=1, stdout=StringIO())
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "bench.json")
+            call_command(
+                "bench_api",
+                repeat=2,
+                output=output,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+            with open(output) as fp:
+                report = json.load(fp)
+        self.assertEqual(report["dataset"]["houses"], 30)
+        results = {endpoint["name"]: endpoint for endpoint in report["endpoints"]}
+        for name in (
+            "houses.list.default",
+            "houses.list.near",
+            "houses.detail",
+            "houses.reviews",
+            "rent-requests.list",
+            "favorites.list",
+        ):
+            self.assertIn(name, results)
+            self.assertGreater(results[name]["queries"], 0)
+            self.assertLessEqual(results[name]["p50_ms"], results[name]["p95_ms"])
+
+    def test_bench_db_connections(self):
+        if connection.vendor != "postgresql":
+            with self.assertRaises(CommandError):
+                call_command("bench_db_connections", stdout=StringIO())
+            return
+        out = StringIO()
+        call_command("bench_db_connections", requests=5, stdout=out)
+        lines = {line.split()[0]: line for line in out.getvalue().splitlines()}
+        # Persistent and pooled connections are opened once, not per request
+        self.assertIn("   1 server connections", lines["persistent"])
+        self.assertIn("   1 server connections", lines["pool"])
+        self.assertIn("   5 server connections", lines["none"])
+        self.assertIn("   5 server connections", lines["external"])
+
+
+class AsgiBenchmarkTests(APITransactionTestCase):
+    # Requests run on other threads' connections, which see committed rows only
+    def test_bench_asgi(self):
+        call_command(
+            "seed_load_data",
+            houses=12,
+            reviews_per_house=2,
+            users=4,
+            favorites_per_user=2,
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command(
+            "bench_asgi",
+            requests=8,
+            workers=2,
+            concurrency=4,
+            latency_ms=1,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines[:3]], ["wsgi", "asgi", "asgi-sync"]
+        )
+        self.assertIn("requests per second of 2 wsgi workers", lines[3])
@@ -2,12 +2,29 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CategoryViewSet, HouseViewSet
+from .views import CategoryViewSet, HouseViewSet, LocationViewSet
 
 router = DefaultRouter()
 router.register(r"houses", HouseViewSet, basename="houses")
 router.register(r"categories", CategoryViewSet, basename="categories")
+router.register(r"locations", LocationViewSet, basename="locations")
 
 urlpatterns = [
     path("", include(router.urls)),
+    # The same reads as async views, for ASGI servers (house_rent.async_api)
+    path(
+        "async/houses/",
+        HouseViewSet.as_async_view("list", basename="houses", detail=False),
+        name="houses-async-list",
+    ),
+    path(
+        "async/houses/<pk>/",
+        HouseViewSet.as_async_view("retrieve", basename="houses", detail=True),
+        name="houses-async-detail",
+    ),
+    path(
+        "async/categories/",
+        CategoryViewSet.as_async_view("list", basename="categories", detail=False),
+        name="categories-async-list",
+    ),
 ]
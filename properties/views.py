@@ -1,34 +1,158 @@
-from django.db.models import Prefetch, Q
+import json
+import math
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    IntegerField,
+    Min,
+    OuterRef,
+    Prefetch,
+    Q,
+    Value,
+    When,
+)
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
-from interactions.models import Review
+from house_rent.async_api import AsyncReadMixin, aiter_in_thread
+from house_rent.routers import use_primary
+from interactions.models import Booking
 from interactions.serializers import ReviewSerializer
 
-from .models import Category, House
-from .pagination import CustomPageNumberPagination
-from .serializers import CategorySerializer, HouseDetailSerializer, HouseListSerializer
-
-
-class BaseViewSetWithAllPagination(viewsets.ModelViewSet):
-    """Base ViewSet that handles ?page=all parameter."""
+from .bulk import (
+    MAX_REPORTED_ERRORS,
+    export_rows,
+    import_houses,
+    stream_csv,
+    stream_jsonl,
+    validate_rows,
+)
+from .cache import CachedReadMixin, bump_generation
+from .conditional import ConditionalGetMixin, resource_version
+from .geo import filter_bbox, filter_near
+from .models import Category, House, HouseImage, ResourceVersion, normalize_location
+from .pagination import (
+    CustomCursorPagination,
+    CustomPageNumberPagination,
+    ModerationQueuePagination,
+    ReviewCursorPagination,
+)
+from .parsers import CSVParser, JSONLinesParser
+from .search import filter_location_prefix, search_houses
+from .serializers import (
+    CategorySerializer,
+    HouseDetailSerializer,
+    HouseImageSerializer,
+    HouseListSerializer,
+    HouseModerationSerializer,
+)
+
+
+def parse_id_list(value, limit):
+    """Parse ``"1,4,7"`` into distinct ints, skipping anything non-numeric."""
+    ids = {int(part) for part in value.split(",") if part.strip().isdigit()}
+    return sorted(ids)[:limit]
+
+
+def parse_moment(value):
+    """Parse an ISO date or datetime; dates mean midnight in the current zone."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            moment = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_period(start, end):
+    """
+    Turn ``available_from`` / ``available_to`` into a half-open period, or
+    None when neither is given or they are invalid. A missing start means
+    now and a missing end means one day after the start.
+    """
+    if not start and not end:
+        return None
+    start = parse_moment(start) if start else timezone.now()
+    if start is None:
+        return None
+    end = parse_moment(end) if end else start + timedelta(days=1)
+    if end is None or end <= start:
+        return None
+    return start, end
+
+
+def parse_floats(value, count):
+    """Parse ``count`` comma separated finite floats, or return None."""
+    try:
+        numbers = [float(part) for part in (value or "").split(",")]
+    except ValueError:
+        return None
+    if len(numbers) != count or not all(map(math.isfinite, numbers)):
+        return None
+    return numbers
+
+
+def valid_point(latitude, longitude):
+    return -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+
+def filter_by_categories(queryset, category_ids, match_all=False):
+    """
+    Keep houses in any (or all) of ``category_ids``. EXISTS probes of the
+    categories through table cannot duplicate house rows the way a JOIN
+    does, so no DISTINCT is needed.
+    """
+    memberships = House.categories.through.objects.filter(house=OuterRef("pk"))
+    if not match_all:
+        return queryset.filter(Exists(memberships.filter(category_id__in=category_ids)))
+    for category_id in category_ids:
+        queryset = queryset.filter(Exists(memberships.filter(category_id=category_id)))
+    return queryset
+
+
+class BaseViewSetWithAllPagination(AsyncReadMixin, viewsets.ModelViewSet):
+    """Base ViewSet that handles ?page=all and the opt-in ?cursor= mode."""
 
     pagination_class = CustomPageNumberPagination
+    cursor_pagination_class = CustomCursorPagination
+    cursor_ordering = ("id",)
+    # ?page=all is streamed in chunks and capped to bound response size
+    all_page_chunk_size = 500
+    all_page_max_rows = 10000
+
+    @property
+    def paginator(self):
+        # Any ?cursor= (even empty, for the first page) selects keyset paging
+        if not hasattr(self, "_paginator") and "cursor" in self.request.query_params:
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
         # Check if 'all' parameter is passed
         if request.query_params.get("page") == "all":
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(
-                {
-                    "count": queryset.count(),
-                    "next": None,
-                    "previous": None,
-                    "results": serializer.data,
-                }
+            return self.streaming_response(
+                self.stream_all(queryset), content_type="application/json"
             )
 
         # Standard pagination
@@ -40,65 +164,116 @@ class BaseViewSetWithAllPagination(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def handles_async(self, request):
+        # ?page=all streams from a sync iterator, see streaming_response()
+        if request.query_params.get("page") == "all":
+            return False
+        return super().handles_async(request)
+
+    def streaming_response(self, content, **kwargs):
+        """
+        Stream ``content``, a sync iterator. Under ASGI it is handed over one
+        chunk at a time, as Django would read a sync iterator whole.
+        """
+        if isinstance(self.request._request, ASGIRequest):
+            content = aiter_in_thread(content)
+        return StreamingHttpResponse(content, **kwargs)
+
+    def stream_all(self, queryset):
+        """
+        Yield the ?page=all body as JSON, serializing ``all_page_chunk_size``
+        rows at a time so memory stays flat. Rows past ``all_page_max_rows``
+        are dropped and flagged with ``"truncated": true``.
+        """
+        rows = queryset[: self.all_page_max_rows + 1].iterator(
+            chunk_size=self.all_page_chunk_size
+        )
+        yield b'{"next":null,"previous":null,"results":['
+        count = 0
+        truncated = False
+        while chunk := list(islice(rows, self.all_page_chunk_size)):
+            if count + len(chunk) > self.all_page_max_rows:
+                chunk = chunk[: self.all_page_max_rows - count]
+                truncated = True
+            data = self.get_serializer(chunk, many=True).data
+            body = b",".join(self.encode_json(item) for item in data)
+            yield (b"," if count else b"") + body
+            count += len(data)
+        yield b'],"count":%d,"truncated":%s}' % (
+            count,
+            b"true" if truncated else b"false",
+        )
+
+    @staticmethod
+    def encode_json(data):
+        return json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
 
-class HouseViewSet(BaseViewSetWithAllPagination):
+class HouseViewSet(CachedReadMixin, ConditionalGetMixin, BaseViewSetWithAllPagination):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = HouseListSerializer  # Default fallback serializer
+    max_category_filters = 20
+    default_radius_km = 10
+    max_radius_km = 500
+    cache_timeouts = {"list": 5 * 60, "retrieve": 10 * 60, "facets": 5 * 60}
+
+    # ?ordering= name -> model field; each is indexed for the public list
+    ordering_fields = {
+        "price": "price",
+        "created_at": "created_at",
+        "rating": "rating_summary__average_rating",
+    }
+    cursor_ordering_fields = {"price", "created_at"}
+    price_facet_bounds = [0, 500, 1000, 2500, 5000, 10000]
+    bulk_max_rows = 10000
+    export_formats = {
+        "jsonl": ("application/x-ndjson", stream_jsonl),
+        "csv": ("text/csv", stream_csv),
+    }
+    rating_facet_bounds = [0, 1, 2, 3, 4]
+    # Write actions that only need the house's identity, owner and status
+    lightweight_actions = {
+        "destroy",
+        "submit_for_approval",
+        "approve",
+        "reject",
+        "add_review",
+    }
 
     def get_queryset(self):
         """Optimized queryset with selective prefetching based on action"""
-        qs = House.objects.select_related("owner").order_by("id")
+        if self.action in self.lightweight_actions:
+            # Only the columns the permission checks and writes touch
+            qs = House.objects.only("id", "owner_id", "approved")
+        elif self.action in ("update", "partial_update"):
+            # The gallery and categories are replaced by the write itself
+            qs = House.objects.select_related("owner", "rating_summary")
+        else:
+            qs = House.objects.select_related("owner").order_by("id")
 
         # Only prefetch on list and retrieve actions
-        if self.action in ["list", "retrieve"]:
-            # Use Prefetch for more control over the related data
+        if self.action in ("list", "moderation_queue"):
+            # Review stats come from the denormalized summary row so
+            # serializers never touch the reviews relation to compute them
+            qs = qs.select_related("rating_summary").prefetch_related("categories")
+            # List pages carry one thumbnail per house, detail the whole gallery
             qs = qs.prefetch_related(
-                "categories",
                 Prefetch(
-                    "reviews",
-                    queryset=Review.objects.select_related("reviewer").order_by(
-                        "-created_at"
-                    ),
-                ),
+                    "gallery",
+                    queryset=HouseImage.objects.filter(is_primary=True).order_by(),
+                    to_attr="primary_images",
+                )
             )
+        elif self.action == "retrieve":
+            qs = HouseDetailSerializer.eager_loading(qs)
 
-        # Apply filters from request parameters
+        # Apply filters from request parameters; facets count the same set
+        if self.action in ("list", "facets"):
+            qs = self.filter_houses(qs)
         if self.action == "list":
-            # Filter by search term
-            search = self.request.query_params.get("search", None)
-            if search:
-                qs = qs.filter(
-                    Q(title__icontains=search)
-                    | Q(description__icontains=search)
-                    | Q(location__icontains=search)
-                )
-
-            # Filter by category
-            category = self.request.query_params.get("category", None)
-            if category:
-                qs = qs.filter(categories__id=category)
-
-            # Filter by price range
-            min_price = self.request.query_params.get("min_price", None)
-            if min_price:
-                try:
-                    min_price = float(min_price)
-                    qs = qs.filter(price__gte=min_price)
-                except (ValueError, TypeError):
-                    pass
-
-            max_price = self.request.query_params.get("max_price", None)
-            if max_price:
-                try:
-                    max_price = float(max_price)
-                    qs = qs.filter(price__lte=max_price)
-                except (ValueError, TypeError):
-                    pass
-
-            # Filter by location
-            location = self.request.query_params.get("location", None)
-            if location:
-                qs = qs.filter(location__icontains=location)
+            qs = self.order_houses(qs)
 
         if self.request.user.is_authenticated:
             if self.request.user.role == "admin":
@@ -108,48 +283,313 @@ class HouseViewSet(BaseViewSetWithAllPagination):
                 return qs.filter(Q(approved=True) | Q(owner=self.request.user))
         return qs.filter(approved=True)
 
+    def filter_houses(self, qs):
+        """Apply the list filters from the query string to ``qs``."""
+        params = self.request.query_params
+
+        # Filter by search term
+        search = params.get("search", None)
+        if search:
+            qs = search_houses(qs, search)
+
+        # Filter by categories: ?category=1,4,7&category_match=any|all
+        category_ids = parse_id_list(
+            params.get("category", ""), limit=self.max_category_filters
+        )
+        if category_ids:
+            match_all = params.get("category_match") == "all"
+            qs = filter_by_categories(qs, category_ids, match_all)
+
+        # Filter by price range
+        min_price = params.get("min_price", None)
+        if min_price:
+            try:
+                min_price = float(min_price)
+                qs = qs.filter(price__gte=min_price)
+            except (ValueError, TypeError):
+                pass
+
+        max_price = params.get("max_price", None)
+        if max_price:
+            try:
+                max_price = float(max_price)
+                qs = qs.filter(price__lte=max_price)
+            except (ValueError, TypeError):
+                pass
+
+        # Filter by availability: no booking overlapping the period
+        period = parse_period(params.get("available_from"), params.get("available_to"))
+        if period:
+            bookings = Booking.objects.filter(house=OuterRef("pk"))
+            qs = qs.filter(~Exists(bookings.overlapping(*period)))
+
+        # Map searches: ?near=lat,lng&radius_km= sorts by distance,
+        # ?bbox=min_lng,min_lat,max_lng,max_lat keeps houses in the box
+        bbox = parse_floats(params.get("bbox"), 4)
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            if (
+                min_lat <= max_lat
+                and valid_point(min_lat, min_lng)
+                and valid_point(max_lat, max_lng)
+            ):
+                qs = filter_bbox(qs, *bbox)
+        near = parse_floats(params.get("near"), 2)
+        if near and valid_point(*near):
+            radius = parse_floats(params.get("radius_km"), 1)
+            radius = radius[0] if radius else self.default_radius_km
+            if 0 < radius <= self.max_radius_km:
+                qs = filter_near(qs, *near, radius)
+
+        # Filter by location
+        location = params.get("location", None)
+        if location:
+            qs = qs.filter(location_normalized__contains=normalize_location(location))
+        return qs
+
+    def get_ordering(self):
+        """
+        Return the ``?ordering=`` field (e.g. ``-price``) if it is one of
+        ``ordering_fields``, else None.
+        """
+        ordering = self.request.query_params.get("ordering", "")
+        if ordering.lstrip("-") in self.ordering_fields:
+            return ordering
+        return None
+
+    def order_houses(self, qs):
+        # Without ?ordering= keep id order, or search rank / distance
+        ordering = self.get_ordering()
+        if ordering is None:
+            return qs
+        descending = ordering.startswith("-")
+        field = F(self.ordering_fields[ordering.lstrip("-")])
+        # Unrated houses sort last either way; id breaks ties stably
+        return qs.order_by(
+            field.desc(nulls_last=True) if descending else field.asc(nulls_last=True),
+            "-id" if descending else "id",
+        )
+
+    @property
+    def cursor_ordering(self):
+        # Cursors encode a position in the first ordering column, which
+        # must be a non-null column of House itself
+        ordering = self.get_ordering()
+        if ordering and ordering.lstrip("-") in self.cursor_ordering_fields:
+            return (ordering, "-id" if ordering.startswith("-") else "id")
+        return ("id",)
+
+    def facet_queryset(self):
+        """The filtered, visible houses as an unordered queryset to group over."""
+        return self.filter_queryset(self.get_queryset()).order_by()
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
+    def facets(self, request):
+        return self.cached_response(self.conditional(self.count_facets), request)
+
+    def count_facets(self, request):
+        houses = self.facet_queryset()
+        categories = (
+            House.categories.through.objects.filter(house__in=houses.values("pk"))
+            .values("category_id", "category__name")
+            .annotate(count=Count("house_id"))
+            .order_by("-count", "category_id")
+        )
+        price_bands = self.count_bands(houses, "price", self.price_facet_bounds)
+        rating_bands = self.count_bands(
+            houses, "rating_summary__average_rating", self.rating_facet_bounds
+        )
+        return Response(
+            {
+                "count": sum(band["count"] for band in price_bands),
+                "categories": [
+                    {
+                        "id": row["category_id"],
+                        "name": row["category__name"],
+                        "count": row["count"],
+                    }
+                    for row in categories
+                ],
+                "price": price_bands,
+                "rating": rating_bands,
+            }
+        )
+
+    @staticmethod
+    def count_bands(houses, field, bounds):
+        """
+        Count ``houses`` per half-open band between consecutive ``bounds``
+        in one grouped query. The last band is open-ended and houses with no
+        value land in a band whose bounds are both None.
+        """
+        whens = [
+            When(**{f"{field}__lt": upper}, then=Value(index))
+            for index, upper in enumerate(bounds[1:])
+        ]
+        band = Case(
+            When(**{f"{field}__isnull": True}, then=Value(-1)),
+            *whens,
+            default=Value(len(bounds) - 1),
+            output_field=IntegerField(),
+        )
+        counts = dict(
+            houses.annotate(band=band)
+            .values("band")
+            .annotate(count=Count("pk"))
+            .order_by()
+            .values_list("band", "count")
+        )
+        bands = [
+            {
+                "min": lower,
+                "max": bounds[index + 1] if index + 1 < len(bounds) else None,
+                "count": counts.get(index, 0),
+            }
+            for index, lower in enumerate(bounds)
+        ]
+        if -1 in counts:
+            bands.append({"min": None, "max": None, "count": counts[-1]})
+        return bands
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user, approved=False)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAuthenticated],
+        parser_classes=[JSONLinesParser, CSVParser, JSONParser],
+    )
+    def bulk(self, request):
+        """
+        Create many listings from JSON lines, CSV or a JSON array. Either
+        every row is created or none is and the row errors are returned.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {"detail": "Expected a list of houses."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.bulk_max_rows:
+            return Response(
+                {"detail": f"At most {self.bulk_max_rows} houses per import."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        validated, errors = validate_rows(rows)
+        if errors:
+            return Response(
+                {
+                    "detail": f"{len(errors)} rows are invalid; nothing was imported.",
+                    "errors": errors[:MAX_REPORTED_ERRORS],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        houses = import_houses(request.user, validated)
+        return Response(
+            {"created": len(houses), "ids": [house.pk for house in houses]},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    def export(self, request):
+        """Stream the user's houses as JSON lines, or CSV with ?export_format=csv."""
+        export_format = request.query_params.get("export_format", "jsonl")
+        if export_format not in self.export_formats:
+            formats = ", ".join(self.export_formats)
+            return Response(
+                {"detail": f"export_format must be one of: {formats}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        content_type, stream = self.export_formats[export_format]
+        rows = export_rows(House.objects.filter(owner=request.user))
+        response = self.streaming_response(stream(rows), content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="houses.{export_format}"'
+        )
+        return response
+
     def get_serializer_class(self):
         if self.action == "list":
             return HouseListSerializer
         return HouseDetailSerializer
 
-    # Cache the list view for anonymous users for 5 minutes
+    def get_resource_version(self, request, *args, **kwargs):
+        versions = ResourceVersion.current(
+            ResourceVersion.HOUSES, ResourceVersion.CATEGORIES
+        )
+        if self.action in ("list", "facets"):
+            return resource_version(*versions.values())
+
+        try:
+            updated_at = (
+                self.get_queryset()
+                .filter(pk=self.kwargs["pk"])
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            updated_at = None  # A malformed pk, as get_object_or_404 treats it
+        if updated_at is None:
+            return None  # Let the handler produce the 404
+        # Review and image pages don't embed categories; the house payloads do
+        if self.action in ("reviews", "images"):
+            return resource_version((0, updated_at))
+        return resource_version((0, updated_at), versions[ResourceVersion.CATEGORIES])
+
+    # Cached per visibility class (anonymous, admin); owners bypass the cache
     def list(self, request, *args, **kwargs):
-        # Skip caching for authenticated users
-        if request.user.is_authenticated:
-            return super().list(request, *args, **kwargs)
-        return super().list(request, *args, **kwargs)
+        return self.cached_response(
+            self.conditional(super().list), request, *args, **kwargs
+        )
 
-    # Cache the detail view for anonymous users for 10 minutes
     def retrieve(self, request, *args, **kwargs):
-        # Skip caching for authenticated users
-        if request.user.is_authenticated:
-            return super().retrieve(request, *args, **kwargs)
-        return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(
+            self.conditional(super().retrieve), request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            self.aconditional(super().alist), request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            self.aconditional(super().aretrieve), request, *args, **kwargs
+        )
 
     def update(self, request, *args, **kwargs):
+        # UpdateModelMixin.update would call get_object() a second time
         house = self.get_object()
-        if request.user.role == "admin" or request.user == house.owner:
-            return super().update(request, *args, **kwargs)
-        return Response({"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
+        if request.user.role != "admin" and request.user.pk != house.owner_id:
+            return Response(
+                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = self.get_serializer(
+            house, data=request.data, partial=kwargs.pop("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
         house = self.get_object()
-        if request.user != house.owner:
+        if request.user.pk != house.owner_id:
             return Response(
                 {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
             )
-        return super().destroy(request, *args, **kwargs)
+        self.perform_destroy(house)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
     def submit_for_approval(self, request, pk=None):
         house = self.get_object()
-        if request.user != house.owner:
+        if request.user.pk != house.owner_id:
             return Response(
                 {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
             )
@@ -162,6 +602,7 @@ class HouseViewSet(BaseViewSetWithAllPagination):
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
+    @use_primary()
     def approve(self, request, pk=None):
         if request.user.role != "admin":
             return Response(
@@ -175,6 +616,7 @@ class HouseViewSet(BaseViewSetWithAllPagination):
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
+    @use_primary()
     def reject(self, request, pk=None):
         if request.user.role != "admin":
             return Response(
@@ -185,12 +627,70 @@ class HouseViewSet(BaseViewSetWithAllPagination):
         house.save(update_fields=["approved"])
         return Response({"detail": "House rejected."}, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated]
+    )
+    @use_primary()
+    def moderate(self, request):
+        """Approve or reject a batch of houses: {"ids": [...], "action": ...}."""
+        if request.user.role != "admin":
+            return Response(
+                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
+            )
+        serializer = HouseModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        approved = serializer.validated_data["action"] == "approve"
+        updated = House.set_approved(serializer.validated_data["ids"], approved)
+        # The UPDATE bypasses the signals that normally invalidate reads
+        if updated:
+            ResourceVersion.bump(ResourceVersion.HOUSES)
+            bump_generation()
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated]
+    )
+    @use_primary()
+    def moderation_queue(self, request):
+        """Unapproved houses, oldest first, for admins to work through."""
+        if request.user.role != "admin":
+            return Response(
+                {"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN
+            )
+        queryset = self.get_queryset().filter(approved=False)
+        paginator = ModerationQueuePagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = HouseListSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=["get"], permission_classes=[permissions.AllowAny])
     def reviews(self, request, pk=None):
+        return self.conditional(self.list_reviews)(request, pk=pk)
+
+    def list_reviews(self, request, pk=None):
         house = self.get_object()
-        reviews = house.reviews.select_related("reviewer").all()
-        serializer = ReviewSerializer(reviews, many=True, context={"request": request})
-        return Response(serializer.data)
+        reviews = house.reviews.select_related("reviewer")
+        paginator = ReviewCursorPagination()
+        page = paginator.paginate_queryset(reviews, request, view=self)
+        serializer = ReviewSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"], permission_classes=[permissions.AllowAny])
+    def images(self, request, pk=None):
+        return self.conditional(self.list_images)(request, pk=pk)
+
+    def list_images(self, request, pk=None):
+        house = self.get_object()
+        paginator = CustomPageNumberPagination()
+        gallery = house.gallery.all()
+        page = paginator.paginate_queryset(gallery, request, view=self)
+        if page is None:
+            # ?page=all: the detail endpoint embeds the whole gallery anyway
+            return Response(HouseImageSerializer(gallery, many=True).data)
+        serializer = HouseImageSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
@@ -198,18 +698,72 @@ class HouseViewSet(BaseViewSetWithAllPagination):
     def add_review(self, request, pk=None):
         house = self.get_object()
         serializer = ReviewSerializer(
-            data=request.data, context={"request": request, "house_id": house.id}
+            data=request.data,
+            context={"request": request, "house_id": house.id, "house": house},
         )
         serializer.is_valid(raise_exception=True)
         serializer.save(reviewer=request.user)
         return Response(serializer.data, status=201)
 
 
-class CategoryViewSet(BaseViewSetWithAllPagination):
+class CategoryViewSet(
+    CachedReadMixin, ConditionalGetMixin, BaseViewSetWithAllPagination
+):
     serializer_class = CategorySerializer
     queryset = Category.objects.all().order_by("id")
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-    # Cache category list for 30 minutes as they change infrequently
+    # Categories look the same to everyone and change infrequently
+    cache_timeouts = {"list": 30 * 60}
+
+    def get_cache_visibility(self, request):
+        return "all"
+
+    def get_resource_version(self, request, *args, **kwargs):
+        versions = ResourceVersion.current(ResourceVersion.CATEGORIES)
+        return resource_version(*versions.values())
+
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.cached_response(
+            self.conditional(super().list), request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(
+            self.aconditional(super().alist), request, *args, **kwargs
+        )
+
+
+class LocationViewSet(viewsets.GenericViewSet):
+    permission_classes = [permissions.AllowAny]
+    autocomplete_limit = 10
+    max_autocomplete_limit = 25
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        query = normalize_location(request.query_params.get("q", ""))
+        if not query:
+            return Response({"results": []})
+        try:
+            limit = int(request.query_params.get("limit", self.autocomplete_limit))
+        except (TypeError, ValueError):
+            limit = self.autocomplete_limit
+        limit = max(1, min(limit, self.max_autocomplete_limit))
+
+        matches = (
+            filter_location_prefix(House.objects.filter(approved=True), query)
+            .values("location_normalized")
+            .annotate(location=Min("location"), count=Count("id"))
+            .order_by("-count", "location_normalized")[:limit]
+        )
+        return Response(
+            {
+                "results": [
+                    {
+                        "location": " ".join(row["location"].split()),
+                        "count": row["count"],
+                    }
+                    for row in matches
+                ]
+            }
+        )